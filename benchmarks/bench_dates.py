@@ -0,0 +1,211 @@
+"""
+Micro-benchmarks for the three-part date datatypes, runnable without a
+docassemble server.
+
+    python benchmarks/bench_dates.py
+    python benchmarks/bench_dates.py --save baseline.json
+    python benchmarks/bench_dates.py --baseline baseline.json --threshold 0.15
+
+Reports operations per second and the peak memory allocated by one call.
+With `--baseline`, compares ops/sec against a file saved with `--save`,
+and exits with status 1 if any case got slower by more than
+`--threshold`.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stub_docassemble  # noqa: E402
+
+stub_docassemble.install()
+
+from docassemble.CDTCustomValidation.ALCustomDateTestValidation import (  # noqa: E402
+    ALBirthDateTestValidation,
+    ALThreePartsDateTestValidation,
+    check_empty_parts,
+)
+from docassemble.CDTCustomValidation.al_dates import check_dates, classify_date  # noqa: E402
+
+inputs = {
+    "valid": "02/14/1990",
+    "partial": "02//1990",
+    "malformed": "2/14/90",
+    "impossible": "02/31/1990",
+    "future": "02/14/2999",
+}
+
+# Rows in the list collect re-render case
+table_rows = 300
+
+# Items in the batch cases, mostly valid, the way stored answers are
+batch_size = 10000
+
+
+def _quietly(method, item):
+    """Call a validate-style method, treating a raised error as a result."""
+
+    def run():
+        try:
+            method(item)
+        except stub_docassemble.DAValidationError:
+            pass
+
+    return run
+
+
+def get_cases():
+    """Name -> zero-argument callable, in the order they're reported."""
+    cases = {}
+    for name in ("partial", "malformed"):
+        cases[f"check_empty_parts/{name}"] = (lambda item: lambda: check_empty_parts(item))(
+            inputs[name]
+        )
+    for datatype in (ALThreePartsDateTestValidation, ALBirthDateTestValidation):
+        for name, item in inputs.items():
+            if name == "future" and datatype is ALThreePartsDateTestValidation:
+                continue
+            cases[f"{datatype.name}.validate/{name}"] = _quietly(datatype.validate, item)
+    cases["ALThreePartsDateTestValidation.transform/valid"] = (
+        lambda: ALThreePartsDateTestValidation.transform(inputs["valid"])
+    )
+    stored = ALThreePartsDateTestValidation.transform(inputs["valid"])
+    cases["ALThreePartsDateTestValidation.default_for/valid"] = (
+        lambda: ALThreePartsDateTestValidation.default_for(stored)
+    )
+    # Re-rendering a list collect table prefills every row's date, so one
+    # page calls default_for once per cell
+    table = [
+        ALThreePartsDateTestValidation.transform(f"{1 + row % 12:02d}/{1 + row % 28:02d}/{1950 + row % 70}")
+        for row in range(table_rows)
+    ]
+    cases[f"ALThreePartsDateTestValidation.default_for/table-{table_rows}"] = lambda: [
+        ALThreePartsDateTestValidation.default_for(cell) for cell in table
+    ]
+    # check_dates against the same items one at a time. With numpy
+    # installed, check_dates takes its array path.
+    batch = [
+        f"{1 + row % 12:02d}/{1 + row % 28:02d}/{1950 + row % 70}" if row % 10 else inputs["partial"]
+        for row in range(batch_size)
+    ]
+    cases[f"check_dates/list-{batch_size}"] = lambda: check_dates(batch, birthdate=True)
+    cases[f"classify_date/loop-{batch_size}"] = lambda: [
+        classify_date(item, birthdate=True) for item in batch
+    ]
+    return cases
+
+
+def time_case(run, min_time: float = 0.2, repeat: int = 5) -> float:
+    """Best ops/sec over `repeat` runs of at least `min_time` seconds each."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, int(number * (min_time / max(elapsed, 1e-9))))
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        best = max(best, number / elapsed)
+    return best
+
+
+def peak_allocation(run, samples: int = 50) -> int:
+    """Smallest peak of bytes allocated during one call, after warming up."""
+    run()
+    tracemalloc.start()
+    try:
+        smallest = None
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            run()
+            peak = tracemalloc.get_traced_memory()[1] - before
+            if smallest is None or peak < smallest:
+                smallest = peak
+        return smallest
+    finally:
+        tracemalloc.stop()
+
+
+def run_all(selected=None, min_time: float = 0.2, repeat: int = 5) -> dict:
+    results = {}
+    for name, run in get_cases().items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        results[name] = {
+            "ops_per_sec": time_case(run, min_time=min_time, repeat=repeat),
+            "peak_bytes": peak_allocation(run),
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Names of cases whose ops/sec dropped more than `threshold` below the baseline."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and result["ops_per_sec"] < before["ops_per_sec"] * (1 - threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("cases", nargs="*", help="only run cases whose names contain one of these")
+    parser.add_argument("--save", metavar="PATH", help="write the results to a JSON file")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown that counts as a regression (default 0.10)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing run (default 0.2)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per case (default 5)")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.cases, min_time=args.min_time, repeat=args.repeat)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+
+    width = max(len(name) for name in results) if results else 0
+    print(f"{'case':<{width}}  {'ops/sec':>12}  {'peak bytes':>10}  {'vs baseline':>11}")
+    for name, result in results.items():
+        change = ""
+        if name in baseline:
+            change = f"{result['ops_per_sec'] / baseline[name]['ops_per_sec'] - 1:+.1%}"
+        print(
+            f"{name:<{width}}  {result['ops_per_sec']:>12,.0f}  {result['peak_bytes']:>10,}  {change:>11}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as save_file:
+            json.dump(
+                {"python": platform.python_version(), "results": results},
+                save_file,
+                indent=2,
+            )
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nSlower than the baseline by more than {args.threshold:.0%}:")
+            for name in regressions:
+                print(f"  {name}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+A small stand-in for the parts of `docassemble.base.util` that the date
+datatypes use, so they can be imported and timed without a docassemble
+server. Call `install()` before importing the datatypes.
+
+It's only meant to be about as expensive as the real thing on the paths
+we care about. `as_datetime` uses dateutil when it's installed, like
+docassemble does.
+"""
+import datetime
+import sys
+import types
+
+try:
+    import dateutil.parser
+except ImportError:
+    dateutil = None
+
+
+class CustomDataType:
+    pass
+
+
+class DAValidationError(Exception):
+    def __init__(self, *pargs, field=None):
+        self.field = field
+        super().__init__(*pargs)
+
+
+class DADateTime(datetime.datetime):
+    def format(self, format="long", language=None):
+        # Only the one pattern the datatypes use
+        if format == "MM/dd/yyyy":
+            return self.strftime("%m/%d/%Y")
+        return self.strftime("%B %-d, %Y")
+
+
+class _DateDifference:
+    def __init__(self, delta):
+        self.days = delta.days + delta.seconds / 86400.0
+
+
+def word(the_word, **kwargs):
+    return the_word
+
+
+def log(message, priority="log"):
+    sys.stderr.write(f"{priority}: {message}\n")
+
+
+def get_language():
+    return "en"
+
+
+def get_default_timezone():
+    return "America/New_York"
+
+
+def as_datetime(the_date, timezone=None):
+    import zoneinfo
+
+    if timezone is None:
+        timezone = get_default_timezone()
+    if isinstance(the_date, datetime.date) and not isinstance(the_date, datetime.datetime):
+        the_date = datetime.datetime.combine(the_date, datetime.time())
+    if isinstance(the_date, datetime.datetime):
+        new_datetime = the_date
+    elif dateutil is not None:
+        new_datetime = dateutil.parser.parse(the_date)
+    else:
+        new_datetime = datetime.datetime.strptime(the_date, "%m/%d/%Y")
+    tz = zoneinfo.ZoneInfo(timezone)
+    if new_datetime.tzinfo:
+        new_datetime = new_datetime.astimezone(tz)
+    else:
+        new_datetime = new_datetime.replace(tzinfo=tz)
+    return DADateTime(
+        new_datetime.year,
+        new_datetime.month,
+        new_datetime.day,
+        new_datetime.hour,
+        new_datetime.minute,
+        new_datetime.second,
+        new_datetime.microsecond,
+        tzinfo=new_datetime.tzinfo,
+    )
+
+
+def format_date(the_date, format="long", language=None):
+    if format == "MMMM":
+        return the_date.strftime("%B")
+    return the_date.strftime("%B %-d, %Y")
+
+
+def defined(var):
+    return False
+
+
+def value(var):
+    raise NameError(var)
+
+
+def url_of(file_reference, **kwargs):
+    package, _, path = file_reference.partition(":")
+    return f"/packagestatic/{package}/{path.split('data/static/', 1)[-1]}"
+
+
+def today(timezone=None, format=None):
+    import zoneinfo
+
+    if timezone is None:
+        timezone = get_default_timezone()
+    now = datetime.datetime.now(zoneinfo.ZoneInfo(timezone))
+    return as_datetime(now.date(), timezone=timezone)
+
+
+def date_difference(starting=None, ending=None, timezone=None):
+    return _DateDifference(as_datetime(ending, timezone) - as_datetime(starting, timezone))
+
+
+class _Timezone(datetime.tzinfo):
+    """Just enough of a pytz timezone for `localize()`, if pytz is missing."""
+
+    def __init__(self, name):
+        import zoneinfo
+
+        self._zone = zoneinfo.ZoneInfo(name)
+
+    def utcoffset(self, dt):
+        return self._zone.utcoffset(dt.replace(tzinfo=None))
+
+    def dst(self, dt):
+        return self._zone.dst(dt.replace(tzinfo=None))
+
+    def tzname(self, dt):
+        return self._zone.tzname(dt.replace(tzinfo=None))
+
+    def localize(self, dt):
+        return dt.replace(tzinfo=self)
+
+
+def install():
+    """Put the stand-in in `sys.modules` as `docassemble.base.util`."""
+    util = types.ModuleType("docassemble.base.util")
+    for name in (
+        "CustomDataType",
+        "DAValidationError",
+        "DADateTime",
+        "word",
+        "log",
+        "get_language",
+        "get_default_timezone",
+        "as_datetime",
+        "today",
+        "date_difference",
+        "format_date",
+        "defined",
+        "value",
+        "url_of",
+    ):
+        setattr(util, name, globals()[name])
+    base = sys.modules.get("docassemble.base") or types.ModuleType("docassemble.base")
+    base.util = util
+    sys.modules["docassemble.base"] = base
+    sys.modules["docassemble.base.util"] = util
+    try:
+        import pytz  # noqa: F401
+    except ImportError:
+        sys.modules["pytz"] = types.SimpleNamespace(timezone=_Timezone)
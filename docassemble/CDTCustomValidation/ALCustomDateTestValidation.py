@@ -3,535 +3,1099 @@ from docassemble.base.util import (
     DAValidationError,
     word,
     as_datetime,
-    today,
-    date_difference,
     log,
+    DADateTime,
+    get_default_timezone,
+    get_language,
+    format_date,
+    defined,
+    value,
+    url_of,
 )
-from typing import Optional
-import re
-
-js_text = """\
-
-/* Validation priority (https://design-system.service.gov.uk/components/date-input/#error-messages):
-*  missing or incomplete information (when parent is no longer in focus, highlight fields missing info?)
-*  information that cannot be correct (for example, the number ‘13’ in the month field)
-*  information that fails validation for another reason
-*     (note: maybe less than 4 digits in year, too)
-*/
-
-// da doesn't log the full error sometimes, so we'll do our own try/catch
-try {{
-
-// https://design-system.service.gov.uk/components/date-input/#error-messages
-var priorites_date_part = {{
-  empty: 1,
-  out_of_range: 2,
-  invalid: 3,  // Maybe non-4-digit year
-}};
-
-var priorities_full_date = {{
-  // Multiple or non-determinate out of range, max, min
-  out_of_range: 1,
-  invalid: 2,
-}};
-
-$(document).on('daPageLoad', function(){{
-  // Custom validation
-  // We can't use `$("#myform").validate({{rules:{{...}} }})
-  // etc. because it needs names and we don't have them here.
-  $('#daform').validate({{}});
-
-  //this is an adaptation of Jonathan Pyle's datereplace.js
-    $('input[type="ALThreePartsDateTestValidation"]').each(function(){{
-      var dateElement = this;
-      var required = $(dateElement).closest('.da-form-group').hasClass('darequired');
-      $(dateElement).hide();
-      $(dateElement).attr('type', 'hidden');
-      $(dateElement).attr('aria-hidden', 'true');
-      
-      //Construct the input components
-      var parentElement = $('<div class="form-row row al-split-date-parent">');
-      var almin = $(dateElement).data('almin');
-      var almax = $(dateElement).data('almax');
-      var almin_message = $(dateElement).data('alminmessage');
-      var almax_message = $(dateElement).data('almaxmessage');
-      
-      // Avoid .data for our dynamic stuff - caching problems
-      // https://forum.jquery.com/topic/jquery-data-caching-of-data-attributes
-      // https://stackoverflow.com/a/8708345/14144258
-      $(parentElement).attr('data-almin', almin);
-      $(parentElement).attr('data-almax', almax);
-      
-      $(parentElement).attr('data-alminmessage', almin_message);
-      $(parentElement).attr('data-almaxmessage', almax_message);
-      
-      // TODO: Set names of inputs to same as ids of inputs, then use
-      // the other things that go with it, like `for`. We might then
-      // be able to make a jQuery validation plugin `group`. Still not sure
-      // `group` is useful since we need to sometimes treat the fields
-      // individually. https://stackoverflow.com/a/14147170/14144258
-      // TODO: Check out `ignore: ''` https://stackoverflow.com/questions/13692061/using-the-jquery-validate-plugin-to-check-if-one-or-more-checkboxes-with-differ#comment18861816_13708252
-      // That might break docassemble things, though, if we can't make it specific
-      // to just these fields.
-      
-      var monthId = dateElement.id + '-month';
-      var monthParent = $('<div class="col">');
-      var monthLabel = $('<label style="text-align:center">{month}</label>');
-      monthLabel.attr( 'for', monthId );
-      var monthElement = $('<select class="form-select al-split-date month ' + dateElement.id + '" style="width:7.5em">');
-      monthElement.attr( 'id', monthId );
-      monthElement.attr( 'required', required );
-      monthElement.prop( 'required', required );
-      
-      var dayId = dateElement.id + '-day';
-      var dayParent = $('<div class="col">');
-      var dayLabel = $('<label style="text-align:center">{day}</label>');
-      dayLabel.attr( 'for', dayId );
-      // Reconsider type `number`
-      // https://github.com/alphagov/govuk-design-system-backlog/issues/42#issuecomment-409848587
-      // `inputmode` ("numeric") not fully supported yet (02/09/2023)
-      // Avoid `pattern` - voice control will enter invalid input (https://github.com/alphagov/govuk-design-system-backlog/issues/42#issuecomment-775103437)
-      var dayElement = $('<input class="form-control day al-split-date ' + dateElement.id + '" type="number" min="1" max="31">' );
-      dayElement.attr( 'id', dayId );
-      dayElement.attr( 'required', required );
-      dayElement.prop( 'required', required );
-      
-      var yearId = dateElement.id + '-year';
-      var yearParent = $('<div class="col">');
-      var yearLabel = $('<label style="text-align:center">{year}</label>');
-      yearLabel.attr( 'for', yearId );
-      //Do not restrict year input range for now.
-      // Reconsider type `number`
-      // https://github.com/alphagov/govuk-design-system-backlog/issues/42#issuecomment-409848587
-      // `inputmode` ("numeric") not fully supported yet (02/09/2023)
-      // Avoid `pattern` - voice control will enter invalid input (https://github.com/alphagov/govuk-design-system-backlog/issues/42#issuecomment-775103437)
-      var yearElement = $('<input class="form-control year al-split-date ' + dateElement.id + '" type="number">');
-      yearElement.attr( 'id', yearId );
-      yearElement.attr( 'required', required );
-      yearElement.prop( 'required', required );
-      
-      // TODO: try removing this
-      var errorElement = $('<span id="' + dateElement.id + '-error" class="da-has-error invalid-feedback al-split-date error"></div>');
-        
-      // If we're returning to a variable that has already been defined
-      // prepare to use that variable's values
-      var dateParts;
-      if ( $(dateElement).val() ) {{
-        dateParts = $(dateElement).val().split( '/' );
-        dateParts.forEach( function( part, index, dateParts ) {{
-          var partInt = parseInt( part );
-          if (isNaN(partInt)) {{
-            dateParts[ index ] = '';
-          }} else {{
-            dateParts[ index ] = partInt;
-          }}
-        }});
-      }} else {{
-        dateParts = null;
-      }}
-          
-      // Insert previous answers if possible
-      
-      // -- Month --
-      // "No month selected" option
-      var first_opt = $("<option>");
-      first_opt.val("");
-      first_opt.text("");
-      monthElement.append( first_opt );
-      // Add every calendar month (based on user's computer's date system? lanugage?)
-      var option = null
-      for(var month=0; month < 12; month++) {{
-        opt = $("<option>");
-        if ( month < 9 ) {{
-          opt.val('0' + (month + 1));
-        }} else {{
-          opt.val(month + 1);
-        }}
-        
-        // Convert the month number to a month name for the option text
-        var dt = new Date(1970, month, 1);
-        opt.text(dt.toLocaleString('default', {{ month: 'long' }}));
-        
-        // Use previous values if possible
-        if ( dateParts && parseInt( opt.val() ) === dateParts[ 0 ]) {{
-          opt.attr('selected', 'selected');
-        }}
-        
-        monthElement.append(opt);
-      }}  // ends for every month
-    
-      // -- Day and year --
-      // Use previous values if possible
-      if ( dateParts ) {{
-        dayElement.val( dateParts[ 1 ]);
-        yearElement.val( dateParts[ 2 ]);
-      }}
-      
-      // -- Add elements to DOM --
-      
-      $(dateElement).before(parentElement); 
-      $(monthParent).append(monthLabel);
-      $(monthParent).append(monthElement);
-      $(parentElement).append(monthParent); 
-      $(dayParent).append(dayLabel);
-      $(dayParent).append(dayElement);
-      $(parentElement).append(dayParent); 
-      $(yearParent).append(yearLabel);
-      $(yearParent).append(yearElement);
-      $(parentElement).append(yearParent);
-      // TODO: try removing this
-      $(parentElement).append(errorElement);
-      
-      // -- Update on 'change' event --
-      
-      // Updates will be triggered when the user leaves an input field
-      yearElement.on('change', updateDate);
-      monthElement.on('change', updateDate);
-      dayElement.on('change', updateDate);
-      
-      // Update value of original input when values change.
-      function updateDate() {{
-        var data = get_date_data(parentElement);
-        var date_str = data.year + '-' + data.month + '-' + data.day;
-        var val = data.month + '/' + data.day + '/' + data.year;
-        if ( val === '//' ) {{
-          val = '';
-        }}
-        $(dateElement).val( val );
-      }};  // Ends updateDate()
-      
-      // -- Validation for these elements --
-      
-      // TODO: I think it might be possible to use `groups`, but
-      // I'm not sure how. This plugin is poorly documented.
-      
-      // `depends` docs: https://stackoverflow.com/a/13626251/14144258 and
-      // https://jqueryvalidation.org/validate/
-      $('.' + dateElement.id).each(function() {{
-        let elem = this;
-        $(elem).rules( 'add', {{
-          almin: {{
-            depends: function(element) {{
-              return get_$parent(element).attr('data-almin') !== undefined;
-            }}
-          }},  // Do I even need to do `depends` if I'm doing it inside this loop?
-          almax: {{
-            depends: function(element) {{
-              // Birthdates always have a max value
-              if ( is_birthdate(element) ) {{
-                // Q: Something is going on because this whole thing is run
-                // three times, once for each field. Are we going to have problems
-                // when there are e.g. multiple 3-part dates on the page?
-                console.log('is birthdate');  // With 1 3-part field and 1 bday, gets logged 3 times
-                return true;
-              }}
-              // Otherwise, check the element itself
-              return get_$parent(element).attr('data-almax') !== undefined;
-            }}
-          }},
-        }});  // ends add rules
-        
-        // Avoid later elements overwriting messages of earlier elements by
-        // adding messages dynamically. https://stackoverflow.com/a/20928765/14144258
-        // `.one()` will make sure this is only set once
-        $(this).one('change', function (event) {{
-        
-          // Add this error validation to the existing error validation
-          var originalErrorPlacement = $('#daform').validate().settings.errorPlacement;
-          var errorPlacement = function(error, element) {{
-            // Finds an AL date parent
-            var $parent = get_$parent(element);
-            
-            // If this isn't an AL date, use the original behavior
-            if (!$parent[0]) {{
-              originalErrorPlacement(error, element);
-              return;
-            }}
-            
-            // Otherwise, use our custom error labeling
-            $($parent.find('span.invalid-feedback')).remove();
-            // For codepen practice:
-            // $($parent.find('label.error')).remove();
-            $(error).appendTo($parent);
-            // Add class 'is-invalid', set aria-invalid to true
-            // and aria-describedby to something like
-            // "dGVzdF8zX3BhcnQ-year-error dGVzdF8zX3BhcnQ-month-error dGVzdF8zX3BhcnQ-day-error"
-            // https://stackoverflow.com/a/53404898/14144258
-            // using the three elements' `id`s.
-            // TODO: In future, this should depend on what kind of invalidation
-            // it is. That info could be stored in a `data` attribute
-            
-          }};
-          // Override the previous errorPlacement
-          var validator = $("#daform").data('validator');
-          validator.settings.errorPlacement = errorPlacement;
-          
-          
-          // -- Styling (see al_dates.css) --
-          
-          var originalHighlight = $('#daform').validate().settings.highlight;
-          var highlight = function(element, errorClass, validClass) {{
-            // Finds an AL date parent
-            var $al_parent = get_$parent(element);
-            // Highlight all of the children inputs
-            // TODO: Only do this on min/max/invalid date failures
-            $al_parent.addClass('invalid');
-            
-            originalHighlight(element, errorClass, validClass);
-          }};
-          // Override the previous highlight
-          var validator = $("#daform").data('validator');
-          validator.settings.highlight = highlight;
-          
-          var originalUnhighlight = $('#daform').validate().settings.unhighlight;
-          var unhighlight = function(element, errorClass, validClass) {{
-            // Finds an AL date parent
-            var $al_parent = get_$parent(element);
-            // Unhighlight all of the children inputs
-            // TODO: Only do this on min/max/invalid date failures
-            $al_parent.removeClass('invalid');
-            
-            originalUnhighlight(element, errorClass, validClass);
-          }};
-          // Override the previous highlight
-          var validator = $("#daform").data('validator');
-          validator.settings.unhighlight = unhighlight;
-          
-          // -- Messages --
-          var default_min_message = 'This date is too early';
-          var default_max_message = 'This date is too late';
-          // Birthdays have a different default max message
-          if (is_birthdate(event.target)) {{
-            default_max_message = 'The birthdate must be in the past';
-          }}
-          
-          var min_message = get_$parent(this).attr('data-alminmessage') || default_min_message;
-          var max_message = get_$parent(this).attr('data-almaxmessage') || default_max_message;
-          
-          // Dynamically set the message
-          // TODO: Do we need to ensure other messages aren't errased?
-          // So far we've seen other messages still show up just fine.
-          $(this).rules('add', {{
-            messages: {{
-              almin: min_message,
-              almax: max_message,
-            }},
-          }});
-          // trigger immediate validation to update message
-          $(this).valid();
-        }});  // ends on change
-      }});  // ends for all 3 part dates
-      
-      // TODO: Maybe add a message for an incomplete date when the parent loses focus
-      
-    }});  // ends for each input
-  
-  // No jQuery validation for original field, since it doesn't work on hidden
-  // elements last time we tried
-
-  $.validator.addMethod('almin', function(value, element, params) {{
-    // TODO: special invalidation for invalid dates
-    // TODO: add highlighting class to parent in here, since
-    // min invalidates all. That way styling will be per invalidation
-    // type. Still need to remove in `unhighlight`. Also still need
-    // to figure out how to prioritize types of validation.
-    
-    var data = get_date_data(element);
-    // Don't show an error if the date is only partly filled
-    if (data.year == '' || data.month == '' || data.day === '') {{
-      // TODO: Add a message for an incomplete date? Elsewhere.
-      return true;
-    }}
-    var date_val = new Date(data.year + '-' + data.month + '-' + data.day);
-    if ( isNaN( date_val ) ) {{
-      // This only handles `max`. Handle invalid date input elsewhere.
-      // TODO: https://stackoverflow.com/a/8098359/14144258
-      return true;
-    }}
-    var $parent = get_$parent(element);
-    // TODO: Catch invalid min dates? Useful for devs. Otherwise very hard to track down.
-    var date_min = new Date($parent.attr('data-almin'));
-    // console.log('data', data, 'date_val', date_val);
-    // console.log( '$parent', $parent );
-    // console.log('date_min', date_min);
-    return date_val >= date_min;
-  }});
-
-  $.validator.addMethod('almax', function(value, element, params) {{
-    // TODO: special invalidation for invalid dates
-    // TODO: add highlighting class to parent in here, since
-    // max invalidates all
-    // console.log('=== validating max ===');
-    
-    var data = get_date_data(element);
-    // Don't show an error if the date is only partly filled
-    if (data.year == '' || data.month == '' || data.day === '') {{
-      return true;
-    }}
-    var date_val = new Date(data.year + '-' + data.month + '-' + data.day);
-    // TODO: Will not check for 2/31/nnnn, etc.
-    if ( isNaN( date_val ) ) {{
-      // This only handles `max`. Handle invalid date input elsewhere.
-      // TODO: https://stackoverflow.com/a/8098359/14144258
-      return true;
-    }}
-    var $dates_parent = get_$parent(element);
-    var max_attr = $dates_parent.attr('data-almax')
-    // TODO: Catch invalid max dates? Useful for devs, but not as useful as min.
-    var date_max = new Date(max_attr);
-    if ( isNaN(date_max) && is_birthdate(element)) {{
-      date_max = new Date(Date.now())
-    }}
-    // console.log('max_attr', max_attr, 'date_max', date_max);
-    // Note that a year input of "1" counts as a date of 2001
-    return date_val <= date_max;
-  }});
-
-  function get_date_data (element) {{
-    /**
-    * Given an element that holds a part of the date information,
-    * return the full date data as an object.
-    * 
-    * @returns {{year: str, month: str, day: str}}
-    */
-    var year_elem = get_$parent(element).find('.year')[0];
-    var month_elem = get_$parent(element).find('.month')[0];
-    var day_elem = get_$parent(element).find('.day')[0];
-    var date_data = {{
-      year: $(year_elem).val(),
-      month: $(month_elem).val(),
-      day: $(day_elem).val(),
-    }};
-    // console.log( 'date_data in get_date_date()', date_data );
-    return date_data;
-
-  }};  // Ends get_date_data()
-  
-  function get_$parent(element) {{
-    /** Return the element we created to surround our date elements.
-    *   Easier to maintain all in one place. */
-    // `.closest()` will get the element itself if appropriate
-    return $(element).closest('.al-split-date-parent');
-  }};  // Ends get_$parent()
-
-  function is_birthdate(element) {{
-    /** If the element is part of a birthdate field, returns true, otherwise false. */
-    let $search_results = get_$parent(element).parent().find('.daALBirthDateTestValidation');
-    return Boolean($search_results[0]);
-  }};  // Ends is_birthdate()
-
-}});  // ends on da page load
-
-}} catch (error) {{
-  console.error('Error in AL date CusotmDataTypes', error);
-}}
-"""
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+import base64
+import bisect
+import datetime
+import functools
+import hashlib
+import html
+import json
+import pytz
+import threading
+import time
+from .al_dates import (
+    EMPTY_ALL,
+    EMPTY_MONTH,
+    EMPTY_DAY,
+    EMPTY_YEAR,
+    EMPTY_MONTH_DAY,
+    EMPTY_MONTH_YEAR,
+    EMPTY_DAY_YEAR,
+    MALFORMED,
+    INVALID_DATE,
+    FUTURE_BIRTHDATE,
+    BELOW_MIN,
+    ABOVE_MAX,
+    EXCLUDED_DAY,
+    BELOW_MIN_AGE,
+    ABOVE_MAX_AGE,
+    empty_part_codes,
+    empty_part_messages,
+    empty_parts_code,
+    month_lengths,
+    DateBatchResult,
+    classify_date,
+    check_dates,
+    date_pattern,
+    parse_date_parts,
+    format_date_parts,
+    current_date,
+    today_ordinal,
+    DateBound,
+    compile_bound,
+    bounds_code,
+    date_key,
+    age_on,
+    age_code,
+    ExclusionCalendar,
+    exclusion_calendars,
+    register_exclusion_calendar,
+    compile_exclusion,
+    exclusion_token,
+)
+from .assets import hashed_name
+
+# Each datatype's `javascript` is just this line. The widget itself lives in
+# data/static/al_dates.js, which the browser can cache across pages.
+bootstrap_js = "(window.alDateTypes = window.alDateTypes || []).push({settings});"
+
+
+# Defaults for dates outside `almin`/`almax`, when the field gives no message
+bound_messages = {
+    BELOW_MIN: "This date is too early",
+    ABOVE_MAX: "This date is too late",
+}
+
+# The answer goes in the {}
+future_birthdate_message = "Answer with a <strong>date of birth</strong> ({} is in the future)"
+
+# The answer, then the next day that's allowed
+excluded_day_message = "{} is not an allowed day. The next allowed day is {}."
+
+# The age limit goes in the {}
+age_messages = {
+    BELOW_MIN_AGE: "The age must be at least {}",
+    ABOVE_MAX_AGE: "The age must be at most {}",
+}
+
+
+def client_rules(
+    error_messages: Dict[str, str], rules: Sequence, language: Optional[str] = None
+) -> dict:
+    """
+    The completeness and calendar rules `validate` uses, as data for
+    al_dates.js, with a datatype's `error_messages` and the rest of the
+    messages in `language`. `checks` names the datatype's `rules`, so the
+    browser only runs the ones the server does. The browser can then catch
+    the same mistakes without a round trip, and the two sides can't
+    disagree about them.
+    """
+    messages = {
+        code: translated(text, language) for code, text in empty_part_messages.items()
+    }
+    for code, text in error_messages.items():
+        messages[code] = translated(text, language)
+    for code, text in bound_messages.items():
+        messages[code] = translated(text, language)
+    messages[FUTURE_BIRTHDATE] = translated(future_birthdate_message, language)
+    messages[EXCLUDED_DAY] = translated(excluded_day_message, language)
+    for code, text in age_messages.items():
+        messages[code] = translated(text, language)
+    return {
+        # JavaScript has no \Z, but `$` means the same there
+        "pattern": date_pattern.pattern.replace("\\Z", "$"),
+        "empty_part_codes": list(empty_part_codes),
+        "month_lengths": list(month_lengths),
+        "malformed": MALFORMED,
+        "invalid_date": INVALID_DATE,
+        "below_min": BELOW_MIN,
+        "above_max": ABOVE_MAX,
+        "future_birthdate": FUTURE_BIRTHDATE,
+        "excluded_day": EXCLUDED_DAY,
+        "below_min_age": BELOW_MIN_AGE,
+        "above_max_age": ABOVE_MAX_AGE,
+        "messages": messages,
+        "checks": [rule.__name__ for rule in rules],
+    }
+
+
+class WidgetScript(NamedTuple):
+    text: str
+    # Short content hash, e.g. for telling cached copies apart
+    fingerprint: str
+
+
+# (input type, language) -> WidgetScript, filled in as languages get used
+_widget_scripts = {}
+
+
+def widget_script(
+    input_type: str,
+    error_messages: Dict[str, str],
+    rules: Sequence,
+    language: Optional[str] = None,
+    for_page: bool = False,
+) -> WidgetScript:
+    """
+    The bootstrap JavaScript that hands `input_type`'s settings, with labels
+    in `language` (the current language if not given), to al_dates.js.
+    `error_messages` and `rules` are the datatype's attributes of the same
+    names. With `for_page`, al_dates.js keeps these settings over any
+    that aren't, like the ones in the datatype's own `javascript`. Built
+    the first time it's asked for and kept after that.
+    """
+    if language is None:
+        language = get_language()
+    key = (input_type, tuple(rules), language, for_page)
+    script = _widget_scripts.get(key)
+    if script is None:
+        settings = {
+            "type": input_type,
+            "labels": {
+                "month": word("Month", language=language),
+                "day": word("Day", language=language),
+                "year": word("Year", language=language),
+            },
+            "rules": client_rules(error_messages, rules, language),
+            "for_page": for_page,
+        }
+        # Keep a stray `</script>` in a translation from ending the script
+        text = bootstrap_js.format(settings=json.dumps(settings).replace("<", "\\u003c"))
+        script = WidgetScript(text, hashlib.sha256(text.encode("utf-8")).hexdigest()[:12])
+        _widget_scripts[key] = script
+    return script
+
+
+def field_id(var_name: str) -> str:
+    """
+    The `id` docassemble gives a field's input: the variable name in
+    base64, without `=` or line breaks.
+    """
+    return base64.b64encode(var_name.encode("utf-8")).decode("ascii").replace("=", "")
+
+
+# language -> the month <option>s, filled in as languages get used
+_month_options = {}
+
+
+def month_options(language: Optional[str] = None) -> str:
+    """The month <select>'s options, with month names in `language`."""
+    if language is None:
+        language = get_language()
+    options = _month_options.get(language)
+    if options is None:
+        options = '<option value=""></option>' + "".join(
+            '<option value="{:02d}">{}</option>'.format(
+                month,
+                html.escape(format_date(datetime.date(2000, month, 1), format="MMMM", language=language)),
+            )
+            for month in range(1, 13)
+        )
+        _month_options[language] = options
+    return options
+
+
+def widget_html(
+    datatype: type,
+    var_name: str,
+    item=None,
+    required: bool = False,
+    language: Optional[str] = None,
+) -> str:
+    """
+    The finished month, day and year widget for `var_name`'s field, the same
+    markup al_dates.js would build, filled in with `item` (a value
+    `default_for` understands). al_dates.js adopts it instead of building
+    its own. An inline style hides the field's own input, so the page looks
+    right before any script runs. `required` only covers that time too. When
+    al_dates.js adopts the widget, it sets `required` from the field itself.
+    """
+    if language is None:
+        language = get_language()
+    labels = {
+        part: html.escape(translated(part.capitalize(), language))
+        for part in ("month", "day", "year")
+    }
+    id_ = html.escape(field_id(var_name))
+    month, day, year = "", "", ""
+    if item:
+        text = datatype.default_for(item) or ""
+        parts = text.split("/")
+        if len(parts) == 3:
+            month, day, year = parts
+    options = month_options(language)
+    if month:
+        options = options.replace(
+            f'<option value="{month.zfill(2)}">', f'<option value="{month.zfill(2)}" selected>', 1
+        )
+    required_attribute = " required" if required else ""
+    return (
+        f'<style>[id="{id_}"]{{display:none}}</style>'
+        f'<div class="form-row row al-split-date-parent" id="{id_}-parent">'
+        f'<div class="col"><label style="text-align:center" for="{id_}-month">{labels["month"]}</label>'
+        f'<select class="form-select al-split-date month {id_}" style="width:7.5em" id="{id_}-month"{required_attribute}>{options}</select></div>'
+        f'<div class="col"><label style="text-align:center" for="{id_}-day">{labels["day"]}</label>'
+        f'<input class="form-control day al-split-date {id_}" type="number" min="1" max="31" id="{id_}-day" value="{html.escape(day.lstrip("0"))}"{required_attribute}></div>'
+        f'<div class="col"><label style="text-align:center" for="{id_}-year">{labels["year"]}</label>'
+        f'<input class="form-control year al-split-date {id_}" type="number" id="{id_}-year" value="{html.escape(year)}"{required_attribute}></div>'
+        f'<span id="{id_}-error" class="da-has-error invalid-feedback al-split-date error"></span>'
+        "</div>"
+    )
+
+
+def asset_url(source: str) -> str:
+    """
+    The URL of the built, content-hashed copy of `source` (`al_dates.js` or
+    `al_dates.css`), which can be cached for good. The plain file if the
+    copies haven't been built.
+    """
+    return url_of("docassemble.CDTCustomValidation:data/static/" + hashed_name(source))
+
+
+# Adds the stylesheet and script to <head> once, however many screens ask
+asset_loader_js = """<script>(function(css, js) {{
+  var loaded = window.alDatesAssets = window.alDatesAssets || {{}};
+  if ( !loaded[css] ) {{
+    loaded[css] = true;
+    var link = document.createElement('link');
+    link.rel = 'stylesheet';
+    link.href = css;
+    document.head.appendChild(link);
+  }}
+  if ( !loaded[js] ) {{
+    loaded[js] = true;
+    var script = document.createElement('script');
+    script.src = js;
+    document.head.appendChild(script);
+  }}
+}})({css}, {js});</script>"""
+
+
+def asset_tags(language: Optional[str] = None) -> str:
+    """
+    HTML that loads the built al_dates.css and al_dates.js, for a screen's
+    `script` in place of `features`, which can't name the hashed files.
+    It also gives every date datatype's labels and messages in `language`
+    (the current language if not given). A datatype's own `javascript`
+    only has the language the server started in.
+    """
+    loader = asset_loader_js.format(
+        css=json.dumps(asset_url("al_dates.css")), js=json.dumps(asset_url("al_dates.js"))
+    )
+    scripts = {}
+    datatypes = [ALThreePartsDateTestValidation]
+    while datatypes:
+        datatype = datatypes.pop()
+        scripts.setdefault(datatype.input_type, datatype.javascript_for(language))
+        datatypes.extend(datatype.__subclasses__())
+    return loader + "<script>" + "\n".join(scripts.values()) + "</script>"
+
+
+def date_to_datetime(date: datetime.date) -> DADateTime:
+    """
+    Give a date the same shape `as_datetime()` would: midnight, localized
+    to the default timezone.
+    """
+    localized = pytz.timezone(get_default_timezone()).localize(
+        datetime.datetime(date.year, date.month, date.day)
+    )
+    return DADateTime(
+        localized.year, localized.month, localized.day, tzinfo=localized.tzinfo
+    )
+
+
+class ALDate(datetime.date):
+    """
+    What `transform` gives for datatypes with `compact = True`: a plain date,
+    which pickles in a few bytes instead of a timezone-aware DADateTime.
+    Anything a DADateTime has that a date doesn't, like `.format()` or
+    `.plus()`, goes to a DADateTime built the first time it's needed and
+    never stored with the answers.
+
+    It compares equal to the same plain date, not to a DADateTime. `<`, `>`
+    and `-` work against a DADateTime only with the ALDate on the left,
+    e.g. `answer < today()`. Python's datetime refuses `today() > answer`
+    before asking ALDate, so use `today() > answer.as_datetime()`.
+    """
+
+    __slots__ = ("_rich",)
+
+    def as_datetime(self) -> DADateTime:
+        """This date as the DADateTime the full-size datatypes would give."""
+        try:
+            return self._rich
+        except AttributeError:
+            self._rich = date_to_datetime(self)
+            return self._rich
+
+    def __getattr__(self, name):
+        # Keep pickle, copy and friends from finding DADateTime's versions
+        if name.startswith("__") or name == "_rich":
+            raise AttributeError(name)
+        return getattr(self.as_datetime(), name)
+
+    def __str__(self):
+        return str(self.as_datetime())
+
+    # Never equal to a datetime, so equal values always hash the same.
+    # (A date subclass on the left would otherwise compare only the dates.)
+    def __eq__(self, other):
+        if isinstance(other, datetime.datetime):
+            return False
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        if isinstance(other, datetime.datetime):
+            return True
+        return super().__ne__(other)
+
+    __hash__ = datetime.date.__hash__
+
+    # A date can't be ordered against, or subtracted from, a datetime, but a
+    # DADateTime like `today()` can
+    def _other(self, other):
+        if isinstance(other, datetime.datetime):
+            return self.as_datetime()
+        return super()
+
+    def __lt__(self, other):
+        return self._other(other).__lt__(other)
+
+    def __le__(self, other):
+        return self._other(other).__le__(other)
+
+    def __gt__(self, other):
+        return self._other(other).__gt__(other)
+
+    def __ge__(self, other):
+        return self._other(other).__ge__(other)
+
+    def __sub__(self, other):
+        return self._other(other).__sub__(other)
+
+    def __rsub__(self, other):
+        if isinstance(other, datetime.datetime):
+            return other - self.as_datetime()
+        return super().__rsub__(other)
+
+
+# (language, text) -> text run through word()
+_translations = {}
+
+
+def translated(text: str, language: Optional[str] = None) -> str:
+    """`word(text)`, remembered per language after the first call."""
+    if language is None:
+        language = get_language()
+    key = (language, text)
+    found = _translations.get(key)
+    if found is None:
+        found = word(text, language=language)
+        _translations[key] = found
+    return found
+
+
+class DateValidationError(DAValidationError):
+    """A DAValidationError that also says which check failed, as an al_dates code."""
+
+    def __init__(self, *pargs, code: Optional[str] = None, field: Optional[str] = None):
+        self.code = code
+        super().__init__(*pargs, field=field)
+
+
+def empty_parts_message(item: str, code: str, default_msg="{} is not a valid date") -> str:
+    """The message for an `empty_parts_code()` result."""
+    if code == MALFORMED:
+        return translated(default_msg).format(item)
+    return translated(empty_part_messages[code])
 
 
 def check_empty_parts(item: str, default_msg="{} is not a valid date") -> Optional[str]:
-    parts = item.split("/")
-    empty_parts = [part == "" for part in parts]
-    if len(empty_parts) != 3:
-        return word(default_msg).format(item)
-    if not any(empty_parts):
+    code = empty_parts_code(item)
+    if code is None:
         return None
-    if all(empty_parts):
-        return word("Enter a month, a day, and a year")
-    elif sum(empty_parts) == 2:
-        # only one part was given, enumerate each
-        if not empty_parts[0]:
-            return word("Enter a day and a year")
-        elif not empty_parts[1]:
-            return word("Enter a month and a year")
-        else:
-            return word("Enter a month and a day")
-    elif sum(empty_parts) == 1:
-        if empty_parts[0]:
-            return word("Enter a month")
-        elif empty_parts[1]:
-            return word("Enter a day")
-        else:
-            return word("Enter a year")
+    return empty_parts_message(item, code, default_msg)
+
+
+class ResultCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _ResultCache:
+    """
+    A thread-safe LRU cache for the datatypes' classmethod results. Off until
+    `configure_result_cache()` gives it a size.
+    """
+
+    def __init__(self):
+        self.maxsize = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                found = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return found
+
+    def put(self, key, found):
+        with self._lock:
+            self._entries[key] = found
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_result_cache = _ResultCache()
+
+
+def configure_result_cache(maxsize: int = 1024) -> None:
+    """
+    Turn on memoization of `validate`, `transform` and `default_for` for the
+    AL date datatypes, keeping at most `maxsize` results. `maxsize=0` turns
+    it off again.
+    """
+    with _result_cache._lock:
+        _result_cache.maxsize = max(0, maxsize)
+        while len(_result_cache._entries) > _result_cache.maxsize:
+            _result_cache._entries.popitem(last=False)
+
+
+def clear_result_cache() -> None:
+    """Empty the result cache and reset its counters."""
+    _result_cache.clear()
+
+
+def result_cache_info() -> ResultCacheInfo:
+    """Hits, misses, size limit and current size of the result cache."""
+    return ResultCacheInfo(
+        _result_cache.hits,
+        _result_cache.misses,
+        _result_cache.maxsize,
+        len(_result_cache._entries),
+    )
+
+
+def check_date_bounds(
+    value,
+    almin=None,
+    almax=None,
+    alminmessage: Optional[str] = None,
+    almaxmessage: Optional[str] = None,
+    field: Optional[str] = None,
+) -> bool:
+    """
+    Raise a DAValidationError if `value` is before `almin` or after `almax`.
+    `value` can be a date or the `MM/DD/YYYY` string our widget sends.
+    Bounds are compiled once, so after the first call this is a couple of
+    integer comparisons. For use in `validation code`:
+
+        validation code: |
+          check_date_bounds(court_date, almin=today(), field="court_date")
+    """
+    if not value or (almin is None and almax is None):
+        return True
+    if isinstance(value, datetime.date):
+        ordinal = value.toordinal()
+    else:
+        try:
+            date = parse_date_parts(value)
+        except ValueError:
+            date = None
+        if date is None:
+            # Not a date at all. That's validate's job to report.
+            return True
+        ordinal = date.toordinal()
+    code = bounds_code(ordinal, almin, almax)
+    if code == BELOW_MIN:
+        raise DateValidationError(
+            alminmessage or translated(bound_messages[code]), code=code, field=field
+        )
+    if code == ABOVE_MAX:
+        raise DateValidationError(
+            almaxmessage or translated(bound_messages[code]), code=code, field=field
+        )
+    return True
+
+
+def check_date_allowed(
+    value,
+    alexclude,
+    alexcludemessage: Optional[str] = None,
+    field: Optional[str] = None,
+) -> bool:
+    """
+    Raise a DAValidationError if `value` falls on a day `alexclude` rules
+    out. `alexclude` is an exclusion calendar's name or token, as for the
+    field parameter. For use in `validation code`:
+
+        validation code: |
+          check_date_allowed(filing_date, "court_days", field="filing_date")
+    """
+    calendar = compile_exclusion(alexclude)
+    if not value or calendar is None:
+        return True
+    if isinstance(value, datetime.date):
+        date = value
     else:
-        return word(default_msg).format(item)
+        try:
+            date = parse_date_parts(value)
+        except ValueError:
+            date = None
+        if date is None:
+            return True
+    ordinal = date.toordinal()
+    if calendar.is_excluded(ordinal):
+        suggestion = calendar.next_allowed(ordinal)
+        raise DateValidationError(
+            alexcludemessage
+            or translated(excluded_day_message).format(
+                format_date_parts(date),
+                format_date_parts(datetime.date.fromordinal(suggestion)) if suggestion else "",
+            ),
+            code=EXCLUDED_DAY,
+            field=field,
+        )
+    return True
+
+
+def check_age(
+    value,
+    alminage=None,
+    almaxage=None,
+    alminagemessage: Optional[str] = None,
+    almaxagemessage: Optional[str] = None,
+    field: Optional[str] = None,
+) -> bool:
+    """
+    Raise a DAValidationError if someone born on `value` is younger than
+    `alminage` or older than `almaxage` today. Ages are compared as whole
+    years, with no date arithmetic. For use in `validation code`:
+
+        validation code: |
+          check_age(user_birthdate, alminage=18, field="user_birthdate")
+    """
+    if not value or (alminage is None and almaxage is None):
+        return True
+    if isinstance(value, datetime.date):
+        date = value
+    else:
+        try:
+            date = parse_date_parts(value)
+        except ValueError:
+            date = None
+        if date is None:
+            return True
+    code = age_code(date, alminage, almaxage)
+    if code == BELOW_MIN_AGE:
+        raise DateValidationError(
+            alminagemessage or translated(age_messages[code]).format(alminage),
+            code=code,
+            field=field,
+        )
+    if code == ABOVE_MAX_AGE:
+        raise DateValidationError(
+            almaxagemessage or translated(age_messages[code]).format(almaxage),
+            code=code,
+            field=field,
+        )
+    return True
+
+
+def memoize_result(method):
+    """
+    Cache a datatype classmethod's result (or its DAValidationError) by
+    class, input, language and timezone. Today's date is part of the key too,
+    since a birthdate can stop being in the future overnight. Goes under
+    `@classmethod`.
+    """
+
+    @functools.wraps(method)
+    def wrapper(cls, item):
+        if not _result_cache.maxsize:
+            return method(cls, item)
+        timezone = get_default_timezone()
+        if isinstance(item, datetime.date):
+            # Aware datetimes at the same instant are equal, and hash the
+            # same, even when their local dates differ
+            item_key = (type(item), item.isoformat())
+        else:
+            item_key = item
+        key = (cls, method.__name__, item_key, get_language(), timezone, today_ordinal(timezone))
+        try:
+            found = _result_cache.get(key)
+        except TypeError:
+            # Unhashable input, just don't cache it
+            return method(cls, item)
+        if found is None:
+            try:
+                found = (False, method(cls, item))
+            except DAValidationError as error:
+                found = (True, error)
+            _result_cache.put(key, found)
+        is_error, result = found
+        if is_error:
+            raise result.with_traceback(None)
+        return result
+
+    return wrapper
+
+
+# Upper edges, in microseconds, of the latency histogram's buckets. Calls
+# slower than the last edge go in one more bucket at the end.
+latency_buckets_us = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+# Error code -> the kind of failure metrics count it as
+error_kinds = {
+    EMPTY_ALL: "empty_parts",
+    EMPTY_MONTH: "empty_parts",
+    EMPTY_DAY: "empty_parts",
+    EMPTY_YEAR: "empty_parts",
+    EMPTY_MONTH_DAY: "empty_parts",
+    EMPTY_MONTH_YEAR: "empty_parts",
+    EMPTY_DAY_YEAR: "empty_parts",
+    MALFORMED: "malformed",
+    INVALID_DATE: "invalid_date",
+    FUTURE_BIRTHDATE: "future_birthdate",
+    BELOW_MIN: "out_of_bounds",
+    ABOVE_MAX: "out_of_bounds",
+    EXCLUDED_DAY: "excluded_day",
+    BELOW_MIN_AGE: "out_of_bounds",
+    ABOVE_MAX_AGE: "out_of_bounds",
+}
+
+
+class MethodMetrics(NamedTuple):
+    calls: int
+    # Error kind -> count. Anything that isn't a date error is "other".
+    errors: Dict[str, int]
+    # Counts per bucket of `latency_buckets_us`, plus one for slower calls
+    latency: Tuple[int, ...]
+    total_seconds: float
+
+
+class _Metrics:
+    """
+    Call counts, error counts and latency histograms for the datatypes'
+    classmethods. Off until `configure_metrics()` turns it on.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.log_every = None
+        self._last_log = time.monotonic()
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, kind, elapsed_ns):
+        bucket = bisect.bisect_left(latency_buckets_us, elapsed_ns / 1000)
+        with self._lock:
+            found = self._methods.get(key)
+            if found is None:
+                found = self._methods[key] = [0, {}, [0] * (len(latency_buckets_us) + 1), 0]
+            found[0] += 1
+            if kind is not None:
+                found[1][kind] = found[1].get(kind, 0) + 1
+            found[2][bucket] += 1
+            found[3] += elapsed_ns
+            due = self.log_every is not None and time.monotonic() - self._last_log >= self.log_every
+            if due:
+                self._last_log = time.monotonic()
+        if due:
+            log(metrics_summary())
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: MethodMetrics(calls, dict(errors), tuple(latency), total_ns / 1e9)
+                for key, (calls, errors, latency, total_ns) in self._methods.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._methods.clear()
+            self._last_log = time.monotonic()
+
+
+_metrics = _Metrics()
+
+
+def configure_metrics(enabled: bool = True, log_every: Optional[float] = None) -> None:
+    """
+    Turn on counting calls, errors and time spent in `validate`, `transform`
+    and `default_for` for the AL date datatypes. With `log_every`, also
+    `log()` a summary at most once every that many seconds, checked as calls
+    come in. `enabled=False` turns it off again, keeping what was counted.
+    """
+    with _metrics._lock:
+        _metrics.enabled = enabled
+        _metrics.log_every = log_every if enabled else None
+        _metrics._last_log = time.monotonic()
+
+
+def clear_metrics() -> None:
+    """Forget everything counted so far."""
+    _metrics.clear()
+
+
+def metrics_snapshot() -> Dict[str, MethodMetrics]:
+    """`"Datatype.method"` -> what's been counted for it so far."""
+    return _metrics.snapshot()
+
+
+def metrics_summary() -> str:
+    """One line per method: calls, errors by kind, and mean time per call."""
+    lines = ["AL date datatype metrics:"]
+    for key, found in sorted(metrics_snapshot().items()):
+        errors = ", ".join(f"{kind} {count}" for kind, count in sorted(found.errors.items()))
+        mean_us = found.total_seconds * 1e6 / found.calls if found.calls else 0
+        lines.append(
+            f"  {key}: {found.calls} calls, {mean_us:.1f}us mean, errors: {errors or 'none'}"
+        )
+    return "\n".join(lines)
+
+
+def instrument(method):
+    """
+    Count calls to a datatype classmethod, and its errors and latency, when
+    metrics are on. Goes under `@classmethod`, above `@memoize_result`, so
+    cached answers count too.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(cls, item):
+        if not _metrics.enabled:
+            return method(cls, item)
+        kind = None
+        start = time.perf_counter_ns()
+        try:
+            return method(cls, item)
+        except DAValidationError as error:
+            kind = error_kinds.get(getattr(error, "code", None), "other")
+            raise
+        except Exception:
+            kind = "other"
+            raise
+        finally:
+            _metrics.record(f"{cls.name}.{name}", kind, time.perf_counter_ns() - start)
+
+    return wrapper
+
+
+def date_rule(cost: int):
+    """
+    Mark a function as a `validate` rule that costs about `cost` to run. A
+    rule gets the datatype, the answer, and whatever the rule before it
+    returned: nothing at first, then the `date_pattern` match, then the
+    date. It returns what the next rule gets, or raises a DateValidationError.
+    """
+
+    def mark(rule):
+        rule.cost = cost
+        return rule
+
+    return mark
+
+
+def ordered_rules(*rules) -> tuple:
+    """`rules`, cheapest first, for a datatype's `rules`."""
+    return tuple(sorted(rules, key=lambda rule: rule.cost))
+
+
+def _rule_error(cls, item: str, code: str) -> DateValidationError:
+    messages = cls.error_messages
+    if code in messages:
+        return DateValidationError(translated(messages[code]).format(item), code=code)
+    return DateValidationError(translated(empty_part_messages[code]), code=code)
+
+
+@date_rule(cost=10)
+def check_complete(cls, item, found):
+    """All three parts are filled in."""
+    # An empty part leaves two slashes together, or one at an end
+    if "//" not in item and item[0] != "/" and item[-1] != "/":
+        return found
+    parts = item.split("/")
+    if len(parts) == 3:
+        code = empty_part_codes[(not parts[0]) << 2 | (not parts[1]) << 1 | (not parts[2])]
+        if code:
+            raise _rule_error(cls, item, code)
+    return found
+
+
+@date_rule(cost=20)
+def check_shape(cls, item, found):
+    """It's `MM/DD/YYYY`, the way our widget builds it."""
+    match = date_pattern.match(item)
+    if match is None:
+        raise _rule_error(cls, item, MALFORMED)
+    return match
+
+
+@date_rule(cost=30)
+def check_calendar(cls, item, found):
+    """It's a real date, so not e.g. 2/31."""
+    match = found if found is not None else date_pattern.match(item)
+    if match is None:
+        return None
+    month, day, year = match.groups()
+    try:
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        raise _rule_error(cls, item, INVALID_DATE) from None
+
+
+@date_rule(cost=40)
+def check_not_in_future(cls, item, date):
+    """It's today or earlier."""
+    if date is not None and date.toordinal() > today_ordinal():
+        raise DateValidationError(
+            translated(future_birthdate_message).format(item), code=FUTURE_BIRTHDATE
+        )
+    return date
+
+
+@date_rule(cost=45)
+def check_age_limits(cls, item, date):
+    """Someone born then is within the datatype's `alminage` and `almaxage`."""
+    if date is not None and (cls.alminage is not None or cls.almaxage is not None):
+        check_age(date, cls.alminage, cls.almaxage, cls.alminagemessage, cls.almaxagemessage)
+    return date
+
+
+@date_rule(cost=35)
+def check_allowed_day(cls, item, date):
+    """It's not a day the datatype's `alexclude` calendar rules out."""
+    if date is not None and cls.alexclude is not None:
+        check_date_allowed(date, cls.alexclude, cls.alexcludemessage)
+    return date
+
+
+@date_rule(cost=50)
+def check_min(cls, item, date):
+    """It's on or after the datatype's `almin`, if it has one."""
+    if date is not None and cls.almin is not None:
+        check_date_bounds(date, almin=cls.almin, alminmessage=cls.alminmessage)
+    return date
+
+
+@date_rule(cost=50)
+def check_max(cls, item, date):
+    """It's on or before the datatype's `almax`, if it has one."""
+    if date is not None and cls.almax is not None:
+        check_date_bounds(date, almax=cls.almax, almaxmessage=cls.almaxmessage)
+    return date
 
 
 class ALThreePartsDateTestValidation(CustomDataType):
     name = "ALThreePartsDateTestValidation"
     input_type = "ALThreePartsDateTestValidation"
-    javascript = js_text.format(month=word("Month"), day=word("Day"), year=word("Year"))
+    # What it says about a date that's malformed or impossible, before
+    # translation. `validate` and the browser both use these.
+    error_messages = {
+        MALFORMED: "{} is not a valid date",
+        INVALID_DATE: "{} is not a valid date",
+    }
+    # What `validate` checks, in order. The first one to fail gives the error.
+    rules = ordered_rules(
+        check_complete, check_shape, check_calendar, check_allowed_day, check_min, check_max
+    )
+    # docassemble copies this when the class is created, so it can only
+    # hold one language. `javascript_for()` gives the others. A subclass
+    # with its own `input_type` needs its own line like this one.
+    javascript = widget_script(input_type, error_messages, rules).text
     jq_message = word("Answer with a valid date")
     is_object = True
-    mako_parameters = ['almin', 'almax', 'alminmessage', 'almaxmessage']
+    mako_parameters = ['almin', 'almax', 'alminmessage', 'almaxmessage', 'alexclude', 'alexcludemessage']
+    # Bounds the server enforces for every field of this datatype. docassemble
+    # only gives `validate` the answer, not the field's own `almin`/`almax`,
+    # so set these on a subclass, or use `check_date_bounds` in `validation code`.
+    almin = None
+    almax = None
+    alminmessage = None
+    almaxmessage = None
+    # An exclusion calendar's name or token, the same way. See `check_date_allowed`.
+    alexclude = None
+    alexcludemessage = None
+    # Give `ALDate`s instead of DADateTimes, to keep the stored answers small
+    compact = False
+
+    @classmethod
+    def javascript_for(cls, language: Optional[str] = None) -> str:
+        """
+        This datatype's widget script with labels in `language`, which
+        al_dates.js prefers to the one in `javascript`. `asset_tags()`
+        puts it on the page.
+        """
+        return widget_script(
+            cls.input_type, cls.error_messages, cls.rules, language, for_page=True
+        ).text
 
     @classmethod
+    def widget_html(
+        cls, var_name: str, item=None, required: bool = False, language: Optional[str] = None
+    ) -> str:
+        """
+        This datatype's widget for `var_name`, rendered on the server. Put it
+        in a `note` just before the field:
+
+            fields:
+              - note: ${ ALThreePartsDateTestValidation.widget_html("court_date") }
+              - Court date: court_date
+                datatype: ALThreePartsDateTestValidation
+
+        Without `item`, it's filled in with the variable's value, if defined.
+        """
+        if item is None and defined(var_name):
+            item = value(var_name)
+        return widget_html(cls, var_name, item, required, language)
+
+    @classmethod
+    @instrument
+    @memoize_result
     def validate(cls, item: str):
         # If there's no input in the item, it's valid
         if not isinstance(item, str) or item == "":
             return True
-        else:
-            # Otherwise it needs to be a date after the year 1000. We ourselves make
-            # sure this format is created if the user gives valid info.
-            matches_date_pattern = re.search(r"^\d{1,2}\/\d{1,2}\/\d{4}$", item)
-            if matches_date_pattern:
-                try:
-                    date = as_datetime(item)
-                except Exception as error:
-                    ex_msg = f"{ item } {word('is not a valid date')}"
-                    raise DAValidationError(ex_msg)
-                return True
-            else:
-                msg = check_empty_parts(item)
-                if msg:
-                    raise DAValidationError(msg)
+        # Otherwise it has to get through every rule. We ourselves make sure
+        # the widget builds `MM/DD/YYYY` if the user gives valid info.
+        found = None
+        for rule in cls.rules:
+            found = rule(cls, item, found)
+        return True
 
     @classmethod
+    @instrument
+    @memoize_result
     def transform(cls, item):
         if item:
-            return as_datetime(item)
+            try:
+                date = parse_date_parts(item)
+            except ValueError:
+                date = None
+            if date:
+                if cls.compact:
+                    return ALDate(date.year, date.month, date.day)
+                return date_to_datetime(date)
+            # Not something our widget built. Let docassemble try.
+            rich = as_datetime(item)
+            if cls.compact:
+                return ALDate(rich.year, rich.month, rich.day)
+            return rich
 
     @classmethod
+    @instrument
+    @memoize_result
     def default_for(cls, item):
         if item:
+            # Dates, datetimes, DADateTimes and ALDates
+            if isinstance(item, datetime.date):
+                return format_date_parts(item)
+            if isinstance(item, str):
+                try:
+                    date = parse_date_parts(item)
+                except ValueError:
+                    date = None
+                if date is None:
+                    try:
+                        date = as_datetime(item)
+                    except Exception:
+                        # Let the widget show what it can of it
+                        return item
+                return format_date_parts(date)
             return item.format("MM/dd/yyyy")
 
 
 class ALBirthDateTestValidation(ALThreePartsDateTestValidation):
     name = "ALBirthDateTestValidation"
     input_type = "ALBirthDateTestValidation"
-    javascript = js_text.format(
-        month=word("Month"), day=word("Day"), year=word("Year")
-    ).replace("ALThreePartsDateTestValidation", "ALBirthDateTestValidation")
+    error_messages = {
+        MALFORMED: "{} is not a valid <strong>date of birth</strong>",
+        INVALID_DATE: "{} is not a valid date",
+    }
+    rules = ordered_rules(
+        check_complete,
+        check_shape,
+        check_calendar,
+        check_not_in_future,
+        check_age_limits,
+        check_allowed_day,
+        check_min,
+        check_max,
+    )
+    javascript = widget_script(input_type, error_messages, rules).text
     jq_message = word("Answer with a valid date of birth")
     is_object = True
-    mako_parameters = ['almin', 'almax', 'alminmessage', 'almaxmessage']
+    mako_parameters = [
+        'almin',
+        'almax',
+        'alminmessage',
+        'almaxmessage',
+        'alexclude',
+        'alexcludemessage',
+        'alminage',
+        'almaxage',
+        'alminagemessage',
+        'almaxagemessage',
+    ]
+    # Age limits in whole years, for every field of this datatype. Like
+    # `almin`, set them on a subclass, or use `check_age` in `validation code`.
+    alminage = None
+    almaxage = None
+    alminagemessage = None
+    almaxagemessage = None
+
+
+class ALCompactThreePartsDateTestValidation(ALThreePartsDateTestValidation):
+    name = "ALCompactThreePartsDateTestValidation"
+    input_type = "ALCompactThreePartsDateTestValidation"
+    javascript = widget_script(
+        input_type,
+        ALThreePartsDateTestValidation.error_messages,
+        ALThreePartsDateTestValidation.rules,
+    ).text
+    is_object = True
+    mako_parameters = ['almin', 'almax', 'alminmessage', 'almaxmessage', 'alexclude', 'alexcludemessage']
+    compact = True
+
+
+class ALCompactBirthDateTestValidation(ALBirthDateTestValidation):
+    name = "ALCompactBirthDateTestValidation"
+    input_type = "ALCompactBirthDateTestValidation"
+    javascript = widget_script(
+        input_type,
+        ALBirthDateTestValidation.error_messages,
+        ALBirthDateTestValidation.rules,
+    ).text
+    is_object = True
+    mako_parameters = ALBirthDateTestValidation.mako_parameters
+    compact = True
 
-    @classmethod
-    def validate(cls, item: str):
-        # If there's no input in the item, it's valid
-        if not isinstance(item, str) or item == "":
-            return True
-        else:
-            # Otherwise it needs to be a date on or before today and after the year 1000.
-            # We ourselves create this format if the user gives valid info.
-            matches_date_pattern = re.search(r"^\d{1,2}\/\d{1,2}\/\d{4}$", item)
-            try:
-                date = as_datetime(item)
-            except Exception as error:
-                raise DAValidationError(word("{} is not a valid date").format(item))
-            if matches_date_pattern:
-                date_diff = date_difference(starting=date, ending=today())
-                if date_diff.days >= 0.0:
-                    return True
-                else:
-                    raise DAValidationError(
-                        word(
-                            "Answer with a <strong>date of birth</strong> ({} is in the future)"
-                        ).format(item)
-                    )
-            else:
-                msg = check_empty_parts(
-                    item, default_msg="{} is not a valid <strong>date of birth</strong>"
-                )
-                if msg:
-                    raise DAValidationError(msg)
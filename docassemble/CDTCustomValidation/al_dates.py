@@ -0,0 +1,574 @@
+"""
+The parts of the AL date datatypes that don't need docassemble: reading
+`MM/DD/YYYY` strings, classifying what's wrong with them, today's date and
+batch checks. Batch jobs, scripts and benchmarks can import this without
+loading docassemble. ALCustomDateTestValidation.py builds the
+CustomDataTypes on top of it.
+"""
+from typing import Iterable, NamedTuple, Optional, Tuple
+import base64
+import datetime
+import functools
+import re
+import sys
+import time
+import zoneinfo
+
+
+# The shape our widget gives the hidden input: `MM/DD/YYYY`
+date_pattern = re.compile(r"^(\d{1,2})\/(\d{1,2})\/(\d{4})\Z")
+
+
+def parse_date_parts(item: str) -> Optional[datetime.date]:
+    """
+    Read the date out of a `MM/DD/YYYY` string built by our widget, without
+    going through dateutil. Returns None if `item` doesn't have that shape.
+    Raises a ValueError if it has that shape but isn't a real calendar date,
+    e.g. 2/31/2023.
+    """
+    matches_date_pattern = date_pattern.match(item)
+    if not matches_date_pattern:
+        return None
+    month, day, year = matches_date_pattern.groups()
+    return datetime.date(int(year), int(month), int(day))
+
+
+def format_date_parts(date: datetime.date) -> str:
+    """
+    The `MM/DD/YYYY` string our widget reads back in. Same as a DADateTime's
+    `.format("MM/dd/yyyy")`, without the trip through Babel.
+    """
+    return "%02d/%02d/%04d" % (date.month, date.day, date.year)
+
+
+# Wall clock used for "today". Tests can swap this out to move time around.
+_clock = time.time
+
+# timezone name -> (today's date, its ordinal, timestamp of the next local midnight)
+_today_cache = {}
+
+
+def current_date(timezone: Optional[str] = None) -> datetime.date:
+    """
+    Today's date in `timezone`. If not given, that's docassemble's default
+    timezone when docassemble is running, or the system's otherwise. The
+    answer is cached per timezone until that timezone's next midnight, so
+    most calls are one dict lookup and one comparison.
+    """
+    return _today(timezone)[0]
+
+
+def today_ordinal(timezone: Optional[str] = None) -> int:
+    """`current_date().toordinal()`, from the same cache."""
+    return _today(timezone)[1]
+
+
+def _default_timezone() -> Optional[str]:
+    # Only ask docassemble if something already imported it. Importing it
+    # here would cost far more than everything else in this module.
+    util = sys.modules.get("docassemble.base.util")
+    if util is not None:
+        return util.get_default_timezone()
+    return None
+
+
+def _today(timezone: Optional[str]) -> Tuple[datetime.date, int]:
+    if timezone is None:
+        timezone = _default_timezone()
+    now = _clock()
+    cached = _today_cache.get(timezone)
+    if cached is not None and now < cached[2]:
+        return cached[0], cached[1]
+    # No timezone at all means the system's local time
+    tz = zoneinfo.ZoneInfo(timezone) if timezone else None
+    date = datetime.datetime.fromtimestamp(now, tz).date()
+    # When a DST change skips midnight, this still lands on the moment the new day starts
+    next_midnight = datetime.datetime.combine(
+        date + datetime.timedelta(days=1), datetime.time(), tzinfo=tz
+    ).timestamp()
+    _today_cache[timezone] = (date, date.toordinal(), next_midnight)
+    return date, date.toordinal()
+
+
+# Error codes, so callers can tell failures apart without matching messages
+EMPTY_ALL = "empty_all"
+EMPTY_MONTH = "empty_month"
+EMPTY_DAY = "empty_day"
+EMPTY_YEAR = "empty_year"
+EMPTY_MONTH_DAY = "empty_month_day"
+EMPTY_MONTH_YEAR = "empty_month_year"
+EMPTY_DAY_YEAR = "empty_day_year"
+MALFORMED = "malformed"
+INVALID_DATE = "invalid_date"
+FUTURE_BIRTHDATE = "future_birthdate"
+BELOW_MIN = "below_min"
+ABOVE_MAX = "above_max"
+EXCLUDED_DAY = "excluded_day"
+BELOW_MIN_AGE = "below_min_age"
+ABOVE_MAX_AGE = "above_max_age"
+
+# Indexed by a 3-bit mask of which parts are empty: month 4, day 2, year 1
+empty_part_codes = (
+    None,
+    EMPTY_YEAR,
+    EMPTY_DAY,
+    EMPTY_DAY_YEAR,
+    EMPTY_MONTH,
+    EMPTY_MONTH_YEAR,
+    EMPTY_MONTH_DAY,
+    EMPTY_ALL,
+)
+
+# What to tell the user for each code, before translation
+empty_part_messages = {
+    EMPTY_ALL: "Enter a month, a day, and a year",
+    # only one part was given, enumerate each
+    EMPTY_DAY_YEAR: "Enter a day and a year",
+    EMPTY_MONTH_YEAR: "Enter a month and a year",
+    EMPTY_MONTH_DAY: "Enter a month and a day",
+    EMPTY_MONTH: "Enter a month",
+    EMPTY_DAY: "Enter a day",
+    EMPTY_YEAR: "Enter a year",
+}
+
+# Days in each month of a non-leap year, indexed by month number
+month_lengths = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def empty_parts_code(item: str) -> Optional[str]:
+    """
+    The error code for which parts of a `MM/DD/YYYY` string are empty, or
+    MALFORMED if it doesn't have three parts. None if no part is empty.
+    """
+    parts = item.split("/")
+    if len(parts) != 3:
+        return MALFORMED
+    return empty_part_codes[(not parts[0]) << 2 | (not parts[1]) << 1 | (not parts[2])]
+
+
+class DateBatchResult(NamedTuple):
+    """
+    Results of `check_dates`, one entry per item. Lists for list input,
+    numpy arrays for numpy input. `dates` holds `datetime.date`s (or
+    `datetime64[D]`) and None (or NaT) where the item isn't a date.
+    """
+
+    valid: list
+    codes: list
+    dates: list
+
+
+def classify_date(
+    item, birthdate: bool = False, today_date: Optional[datetime.date] = None
+) -> Tuple[Optional[str], Optional[datetime.date]]:
+    """
+    Return the error code (None if valid) and the date for one item, using
+    the same rules as the datatypes' `validate`.
+    """
+    if not isinstance(item, str) or item == "":
+        return None, None
+    try:
+        date = parse_date_parts(item)
+    except ValueError:
+        return INVALID_DATE, None
+    if date is None:
+        return empty_parts_code(item) or MALFORMED, None
+    if birthdate:
+        if today_date is None:
+            today_date = current_date()
+        if date > today_date:
+            return FUTURE_BIRTHDATE, date
+    return None, date
+
+
+def check_dates(
+    items, birthdate: bool = False, today_date: Optional[datetime.date] = None
+) -> DateBatchResult:
+    """
+    Check many `MM/DD/YYYY` strings at once with the three-part date rules,
+    or the birthdate rules if `birthdate` is True. Takes a list or a numpy
+    array. With numpy installed, strings shaped exactly `MM/DD/YYYY` are
+    checked together with integer math, which is several times faster
+    than one at a time for large batches.
+    """
+    if today_date is None and birthdate:
+        today_date = current_date()
+    np = _numpy()
+    if np is None or len(items) == 0:
+        results = [classify_date(item, birthdate, today_date) for item in items]
+        codes = [code for code, _ in results]
+        return DateBatchResult(
+            valid=[code is None for code in codes],
+            codes=codes,
+            dates=[date for _, date in results],
+        )
+    return _check_dates_numpy(np, items, birthdate, today_date)
+
+
+def _numpy():
+    # numpy is optional and slow to import, so only load it for `check_dates`
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# Days before each month in a year that isn't a leap year, January first
+_days_before_month = (0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+
+def _check_dates_numpy(np, items, birthdate, today_date) -> DateBatchResult:
+    """
+    `check_dates` for the strings our widget builds, `MM/DD/YYYY`, with
+    integer math on the array's characters. Anything else, like `2/3/2020`
+    or an incomplete date, goes through `classify_date` one at a time.
+    """
+    as_list = not isinstance(items, np.ndarray)
+    if not as_list:
+        shape = items.shape
+        items = items.ravel()
+    count = len(items)
+    if not as_list and items.dtype.kind == "U":
+        is_str = np.ones(count, dtype=bool)
+        strings = items.astype("U11")
+    else:
+        # Anything that isn't a string counts as "no answer", like `validate`
+        is_str = np.fromiter((type(item) is str for item in items), bool, count)
+        strings = np.array([item if type(item) is str else "" for item in items], dtype="U11")
+    # One row of 11 code points per item. Longer items are cut to 11, which
+    # still leaves them too long to be `MM/DD/YYYY`.
+    chars = strings.view(np.uint32).reshape(count, 11)
+    digits = chars[:, [0, 1, 3, 4, 6, 7, 8, 9]] - ord("0")
+    fixed = (
+        is_str
+        & (chars[:, 2] == ord("/"))
+        & (chars[:, 5] == ord("/"))
+        & (chars[:, 9] != 0)
+        & (chars[:, 10] == 0)
+        # Below "0" wraps around to a large number, so this is 0-9 only
+        & (digits <= 9).all(axis=1)
+    )
+    digits = digits.astype(np.int64)
+    month = digits[:, 0] * 10 + digits[:, 1]
+    day = digits[:, 2] * 10 + digits[:, 3]
+    year = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+    is_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    safe_month = np.where((month >= 1) & (month <= 12), month, 0)
+    days_in_month = np.asarray(month_lengths)[safe_month] + (is_leap & (safe_month == 2))
+    is_date = fixed & (safe_month > 0) & (year >= 1) & (day >= 1) & (day <= days_in_month)
+    # The same numbers `date.toordinal()` gives
+    before = year - 1
+    ordinals = (
+        before * 365 + before // 4 - before // 100 + before // 400
+        + np.asarray(_days_before_month)[safe_month]
+        + (is_leap & (safe_month > 2))
+        + day
+    )
+
+    codes = np.full(count, None, dtype=object)
+    codes[fixed & ~is_date] = INVALID_DATE
+    if birthdate:
+        codes[is_date & (ordinals > today_date.toordinal())] = FUTURE_BIRTHDATE
+    # Everything else that's a string, the slow way
+    others = [
+        (index, *classify_date(items[index], birthdate, today_date))
+        for index in np.flatnonzero(is_str & ~fixed).tolist()
+    ]
+    for index, code, _ in others:
+        codes[index] = code
+    valid = codes == None  # noqa: E711
+
+    if as_list:
+        dates = [None] * count
+        for index, ordinal in zip(
+            np.flatnonzero(is_date).tolist(), ordinals[is_date].tolist()
+        ):
+            dates[index] = datetime.date.fromordinal(ordinal)
+        for index, _, date in others:
+            dates[index] = date
+        return DateBatchResult(valid=valid.tolist(), codes=codes.tolist(), dates=dates)
+    dates = np.full(count, np.datetime64("NaT"), dtype="datetime64[D]")
+    dates[is_date] = (ordinals[is_date] - datetime.date(1970, 1, 1).toordinal()).astype("datetime64[D]")
+    for index, _, date in others:
+        if date is not None:
+            dates[index] = np.datetime64(date, "D")
+    return DateBatchResult(
+        valid=valid.reshape(shape), codes=codes.reshape(shape), dates=dates.reshape(shape)
+    )
+
+
+# `${ today() }` as written in a field, or what's left of it without mako
+today_bound_pattern = re.compile(r"^(?:\$\{\s*)?today(?:\(\s*\))?(?:\s*\})?$")
+
+
+class DateBound(NamedTuple):
+    """An `almin` or `almax`, as a date ordinal or as days from today."""
+
+    ordinal: int
+    from_today: bool = False
+
+    def resolve(self, timezone: Optional[str] = None) -> int:
+        """The bound's date ordinal for right now."""
+        if self.from_today:
+            return today_ordinal(timezone) + self.ordinal
+        return self.ordinal
+
+
+def compile_bound(expression) -> Optional[DateBound]:
+    """
+    Turn an `almin`/`almax` value into a DateBound, once per distinct value.
+    Takes a date, `YYYY-MM-DD` (with or without a time), `MM/DD/YYYY`, or
+    `${ today() }`. Returns None for no bound. Raises a ValueError for
+    anything else, so a typo in a bound doesn't quietly turn it off.
+    """
+    if isinstance(expression, datetime.date):
+        # Not cached: aware datetimes at the same instant are equal, and
+        # hash the same, even when their local dates differ
+        return DateBound(expression.toordinal())
+    return _compile_bound(expression)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_bound(expression) -> Optional[DateBound]:
+    if expression is None or expression == "":
+        return None
+    if not isinstance(expression, str):
+        raise ValueError(f"{expression!r} is not a date bound")
+    text = expression.strip()
+    if today_bound_pattern.match(text):
+        return DateBound(0, from_today=True)
+    try:
+        date = parse_date_parts(text)
+        if date is None:
+            date = datetime.datetime.fromisoformat(text).date()
+    except ValueError:
+        raise ValueError(f"{expression!r} is not a date bound") from None
+    return DateBound(date.toordinal())
+
+
+def bounds_code(
+    ordinal: int, almin=None, almax=None, timezone: Optional[str] = None
+) -> Optional[str]:
+    """BELOW_MIN or ABOVE_MAX if the date ordinal is out of bounds, otherwise None."""
+    if almin is not None:
+        minimum = compile_bound(almin)
+        if minimum is not None and ordinal < minimum.resolve(timezone):
+            return BELOW_MIN
+    if almax is not None:
+        maximum = compile_bound(almax)
+        if maximum is not None and ordinal > maximum.resolve(timezone):
+            return ABOVE_MAX
+    return None
+
+
+def date_key(date: datetime.date) -> int:
+    """The date as the integer YYYYMMDD, which sorts the same way."""
+    return date.year * 10000 + date.month * 100 + date.day
+
+
+def age_on(birthdate: datetime.date, date: datetime.date) -> int:
+    """
+    Age in whole years on `date` of someone born on `birthdate`. Someone born
+    on February 29 turns a year older on March 1 in years without one.
+    """
+    return (date_key(date) - date_key(birthdate)) // 10000
+
+
+def age_code(
+    birthdate: datetime.date, alminage=None, almaxage=None, timezone: Optional[str] = None
+) -> Optional[str]:
+    """
+    BELOW_MIN_AGE if someone born on `birthdate` is younger than `alminage`
+    today, ABOVE_MAX_AGE if they're older than `almaxage`, otherwise None.
+    Ages can be ints or strings of digits, as field parameters give them.
+    """
+    if alminage is None and almaxage is None:
+        return None
+    age = age_on(birthdate, current_date(timezone))
+    if alminage is not None and alminage != "" and age < int(alminage):
+        return BELOW_MIN_AGE
+    if almaxage is not None and almaxage != "" and age > int(almaxage):
+        return ABOVE_MAX_AGE
+    return None
+
+
+# Day 0 of the widget's day numbers, which count from 1970-01-01 like
+# JavaScript's Date
+epoch_ordinal = datetime.date(1970, 1, 1).toordinal()
+# Weekdays in `date.weekday()` numbering, as a bit mask
+all_weekdays = 0b1111111
+
+
+def _as_date(value) -> datetime.date:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    date = parse_date_parts(value)
+    if date is None:
+        date = datetime.date.fromisoformat(value)
+    return date
+
+
+class ExclusionCalendar:
+    """
+    Days a date answer can't be: some weekdays, like weekends, plus a list of
+    holidays. Every day from `first_year` through `last_year` is one bit,
+    set if the day is excluded, so checking a date is one byte lookup.
+    Outside those years only the weekdays are checked.
+    """
+
+    __slots__ = ("weekdays", "first_ordinal", "days", "bits")
+
+    def __init__(
+        self,
+        weekdays: Iterable[int] = (5, 6),
+        holidays: Iterable = (),
+        first_year: Optional[int] = None,
+        last_year: Optional[int] = None,
+    ):
+        # `weekdays` are `date.weekday()` numbers: Monday is 0, Sunday is 6
+        self.weekdays = 0
+        for weekday in weekdays:
+            self.weekdays |= 1 << weekday
+        if self.weekdays == all_weekdays:
+            raise ValueError("An exclusion calendar can't exclude every weekday")
+        holidays = [_as_date(holiday) for holiday in holidays]
+        years = [holiday.year for holiday in holidays] or [current_date().year]
+        first_year = min(years) if first_year is None else first_year
+        last_year = max(years) if last_year is None else last_year
+        if first_year > last_year:
+            raise ValueError(
+                f"An exclusion calendar's first_year ({first_year}) is after its last_year ({last_year})"
+            )
+        self.first_ordinal = datetime.date(first_year, 1, 1).toordinal()
+        self.days = datetime.date(last_year, 12, 31).toordinal() - self.first_ordinal + 1
+        bits = bytearray((self.days + 7) // 8)
+        for offset in range(self.days):
+            if self._weekday_excluded(self.first_ordinal + offset):
+                bits[offset >> 3] |= 1 << (offset & 7)
+        for holiday in holidays:
+            offset = holiday.toordinal() - self.first_ordinal
+            if 0 <= offset < self.days:
+                bits[offset >> 3] |= 1 << (offset & 7)
+        self.bits = bytes(bits)
+
+    def _weekday_excluded(self, ordinal: int) -> bool:
+        # Ordinal 1 (0001-01-01) was a Monday
+        return bool(self.weekdays >> ((ordinal - 1) % 7) & 1)
+
+    def is_excluded(self, ordinal: int) -> bool:
+        """Whether the day with this date ordinal is excluded."""
+        offset = ordinal - self.first_ordinal
+        if 0 <= offset < self.days:
+            return bool(self.bits[offset >> 3] >> (offset & 7) & 1)
+        return self._weekday_excluded(ordinal)
+
+    def next_allowed(self, ordinal: int) -> Optional[int]:
+        """
+        The ordinal of the first day on or after `ordinal` that isn't
+        excluded, or None if every weekday is. Inside the calendar's years it
+        looks at up to 64 days at a time.
+        """
+        if self.weekdays == all_weekdays:
+            return None
+        end = self.first_ordinal + self.days
+        while ordinal < end:
+            offset = ordinal - self.first_ordinal
+            if offset < 0:
+                if not self._weekday_excluded(ordinal):
+                    return ordinal
+                ordinal += 1
+                continue
+            shift = offset & 7
+            span = min(64 - shift, self.days - offset)
+            window = int.from_bytes(self.bits[offset >> 3 : (offset >> 3) + 8], "little") >> shift
+            free = ~window & ((1 << span) - 1)
+            if free:
+                return ordinal + (free & -free).bit_length() - 1
+            ordinal += span
+        while self._weekday_excluded(ordinal):
+            ordinal += 1
+        return ordinal
+
+    @property
+    def token(self) -> str:
+        """
+        The calendar as one short string, for a field's `alexclude`. The
+        widget checks dates with it too.
+        """
+        return "{}.{}.{}.{}".format(
+            self.first_ordinal - epoch_ordinal,
+            self.days,
+            self.weekdays,
+            base64.b64encode(self.bits).decode("ascii"),
+        )
+
+    @classmethod
+    def from_token(cls, token: str) -> "ExclusionCalendar":
+        """The calendar a `token` was made from."""
+        start, days, weekdays, bits = token.split(".")
+        calendar = cls.__new__(cls)
+        calendar.weekdays = int(weekdays)
+        calendar.first_ordinal = int(start) + epoch_ordinal
+        calendar.bits = base64.b64decode(bits, validate=True)
+        calendar.days = min(int(days), len(calendar.bits) * 8)
+        return calendar
+
+
+# Name -> ExclusionCalendar
+exclusion_calendars = {"weekends": ExclusionCalendar()}
+
+
+def register_exclusion_calendar(
+    name: str,
+    weekdays: Iterable[int] = (5, 6),
+    holidays: Iterable = (),
+    first_year: Optional[int] = None,
+    last_year: Optional[int] = None,
+) -> ExclusionCalendar:
+    """
+    Build an ExclusionCalendar and make it available by `name`, e.g. from a
+    module your interview imports:
+
+        register_exclusion_calendar("court_days", holidays=["2026-11-26", "2026-12-25"])
+    """
+    calendar = ExclusionCalendar(weekdays, holidays, first_year, last_year)
+    exclusion_calendars[name] = calendar
+    return calendar
+
+
+def compile_exclusion(expression) -> Optional[ExclusionCalendar]:
+    """
+    The ExclusionCalendar for an `alexclude` value: a registered calendar's
+    name, a calendar's `token`, or a calendar. None for no calendar. Raises a
+    ValueError for anything else.
+    """
+    if expression is None or expression == "":
+        return None
+    if isinstance(expression, ExclusionCalendar):
+        return expression
+    calendar = exclusion_calendars.get(expression)
+    if calendar is None:
+        calendar = _calendar_from_token(expression)
+    return calendar
+
+
+def exclusion_token(expression) -> str:
+    """
+    The token for a registered calendar's name (or a calendar), to give
+    the widget in a field's `alexclude`:
+
+        alexclude: ${ exclusion_token("court_days") }
+    """
+    calendar = compile_exclusion(expression)
+    return calendar.token if calendar is not None else ""
+
+
+@functools.lru_cache(maxsize=64)
+def _calendar_from_token(token: str) -> ExclusionCalendar:
+    try:
+        return ExclusionCalendar.from_token(token)
+    except (ValueError, AttributeError, TypeError):
+        raise ValueError(f"{token!r} is not an exclusion calendar") from None
@@ -0,0 +1,251 @@
+"""
+Build the minified, content-hashed copies of the widget's static files that
+interviews can serve with long-lived cache headers:
+
+    python -m docassemble.CDTCustomValidation.assets          # write them
+    python -m docassemble.CDTCustomValidation.assets --check  # are they current?
+
+For each source in `data/static/`, writes `al_dates.<hash>.js` (or `.css`),
+a `.gz` copy and, if the brotli module is installed, a `.br` copy, plus
+`al_dates.manifest.json`, which `hashed_name()` reads. The `.br` copies are
+optional: a package built without brotli has none, so servers should fall
+back to the `.gz` ones. setup.py runs this
+before building the package. Only needs the standard library.
+"""
+from typing import Dict, List, Optional
+import argparse
+import functools
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "static")
+sources = ("al_dates.js", "al_dates.css")
+manifest_name = "al_dates.manifest.json"
+
+# What can come right before a `/` that starts a regex literal, not a division
+_regex_before = set("(,=:[!&|?{};+-*%<>~^") | {""}
+
+
+def _skip_string(text: str, start: int) -> int:
+    """Index just past the quoted string that starts at `start`."""
+    quote = text[start]
+    index = start + 1
+    while index < len(text) and text[index] != quote:
+        index += 2 if text[index] == "\\" else 1
+    return index + 1
+
+
+def minify_js(text: str) -> str:
+    """
+    Strip comments, indentation and blank lines outside strings and
+    template literals. Line breaks stay, so automatic semicolon insertion
+    works the same as in the source.
+    """
+    out = []
+    index = 0
+    last = ""  # last non-space character written
+    while index < len(text):
+        char = text[index]
+        if char in "'\"`":
+            end = _skip_string(text, index)
+            out.append(text[index:end])
+            last = char
+            index = end
+        elif text.startswith("//", index):
+            end = text.find("\n", index)
+            index = len(text) if end == -1 else end
+        elif text.startswith("/*", index):
+            end = text.find("*/", index + 2)
+            end = len(text) if end == -1 else end + 2
+            if "\n" in text[index:end]:
+                _end_line(out)
+            elif out and out[-1] not in (" ", "\n"):
+                out.append(" ")
+            index = end
+        elif char == "/" and last in _regex_before:
+            # A regex literal. Slashes inside [...] don't end it.
+            end = index + 1
+            in_class = False
+            while end < len(text) and (text[end] != "/" or in_class):
+                if text[end] == "\\":
+                    end += 1
+                elif text[end] == "[":
+                    in_class = True
+                elif text[end] == "]":
+                    in_class = False
+                end += 1
+            out.append(text[index : end + 1])
+            last = "/"
+            index = end + 1
+        elif char == "\n":
+            _end_line(out)
+            index += 1
+        elif char in " \t\r" and (not out or out[-1] in (" ", "\n")):
+            # Indentation, or more than one space between tokens
+            index += 1
+        else:
+            out.append(char)
+            if not char.isspace():
+                last = char
+            index += 1
+    return "".join(out).strip() + "\n"
+
+
+def _end_line(out: List[str]) -> None:
+    # Drop the line's trailing spaces, and don't start a blank line. Only
+    # ever called between tokens, so whitespace inside strings stays.
+    while out and out[-1] in (" ", "\t", "\r"):
+        out.pop()
+    if out and out[-1] != "\n":
+        out.append("\n")
+
+
+def minify_css(text: str) -> str:
+    """Strip comments and the whitespace CSS doesn't need."""
+    out = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char in "'\"":
+            end = _skip_string(text, index)
+            out.append(text[index:end])
+            index = end
+        elif text.startswith("/*", index):
+            end = text.find("*/", index + 2)
+            index = len(text) if end == -1 else end + 2
+            out.append(" ")
+        elif char.isspace():
+            out.append(" ")
+            while index < len(text) and text[index].isspace():
+                index += 1
+        else:
+            out.append(char)
+            index += 1
+    css = "".join(out)
+    # Outside strings, which the loop above kept whole, these are safe to
+    # tighten. Not before `:`, since `a :hover` isn't `a:hover`.
+    parts = re.split(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')", css)
+    for part_index in range(0, len(parts), 2):
+        part = re.sub(r" ?([{};,>]) ?", r"\1", re.sub(r"  +", " ", parts[part_index]))
+        parts[part_index] = re.sub(r": ", ":", part).replace(";}", "}")
+    return "".join(parts).strip() + "\n"
+
+
+minifiers = {
+    ".js": minify_js,
+    ".css": minify_css,
+}
+
+
+def _brotli():
+    # brotli is optional. Without it there are just no .br files.
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def build_outputs(directory: str = static_dir) -> Dict[str, bytes]:
+    """File name -> contents of everything the build writes, from the sources in `directory`."""
+    outputs = {}
+    manifest = {}
+    brotli = _brotli()
+    for source in sources:
+        stem, extension = os.path.splitext(source)
+        with open(os.path.join(directory, source), encoding="utf-8") as source_file:
+            minified = minifiers[extension](source_file.read()).encode("utf-8")
+        name = f"{stem}.{hashlib.sha256(minified).hexdigest()[:10]}{extension}"
+        manifest[source] = name
+        outputs[name] = minified
+        # mtime=0 so the same input always gives the same bytes
+        outputs[name + ".gz"] = gzip.compress(minified, compresslevel=9, mtime=0)
+        if brotli is not None:
+            outputs[name + ".br"] = brotli.compress(minified, quality=11)
+    outputs[manifest_name] = (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8")
+    return outputs
+
+
+def _hashed_files(directory: str) -> List[str]:
+    pattern = re.compile(r"^al_dates\.[0-9a-f]{10}\.(js|css)(\.gz|\.br)?$")
+    return [name for name in os.listdir(directory) if pattern.match(name)]
+
+
+def _kept_br(name: str, outputs: Dict[str, bytes]) -> bool:
+    # Without brotli here, leave a current file's .br from elsewhere alone
+    return name.endswith(".br") and name[:-3] in outputs and _brotli() is None
+
+
+def build_assets(directory: str = static_dir) -> List[str]:
+    """Write the hashed files and the manifest, remove stale ones, and return what was written."""
+    outputs = build_outputs(directory)
+    for name in _hashed_files(directory):
+        if name not in outputs and not _kept_br(name, outputs):
+            os.remove(os.path.join(directory, name))
+    for name, contents in outputs.items():
+        with open(os.path.join(directory, name), "wb") as output_file:
+            output_file.write(contents)
+    return sorted(outputs)
+
+
+def check_assets(directory: str = static_dir) -> List[str]:
+    """Problems with the built files: missing, out of date or stale. Empty if all is well."""
+    outputs = build_outputs(directory)
+    problems = []
+    for name, contents in sorted(outputs.items()):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            problems.append(f"missing {name}")
+            continue
+        with open(path, "rb") as output_file:
+            found = output_file.read()
+        # Other gzip and brotli builds can compress differently, so only the
+        # minified files and the manifest have to match byte for byte
+        if found != contents and not name.endswith((".gz", ".br")):
+            problems.append(f"out of date {name}")
+    for name in _hashed_files(directory):
+        if name not in outputs and not _kept_br(name, outputs):
+            problems.append(f"stale {name}")
+    return problems
+
+
+@functools.lru_cache(maxsize=None)
+def _manifest(directory: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(directory, manifest_name), encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def hashed_name(source: str, directory: Optional[str] = None) -> str:
+    """
+    The built file name for `source`, e.g. `al_dates.3f2a9c01de.js` for
+    `al_dates.js`. Just `source` if nothing has been built.
+    """
+    return _manifest(directory or static_dir).get(source, source)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Build minified, content-hashed and precompressed copies of the al_dates static files."
+    )
+    parser.add_argument("--check", action="store_true", help="only report whether the built files are current")
+    parser.add_argument("--directory", default=static_dir, help="static directory (default: this package's)")
+    args = parser.parse_args(argv)
+    if args.check:
+        problems = check_assets(args.directory)
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        return 1 if problems else 0
+    for name in build_assets(args.directory):
+        print(name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Check the dates in a CSV or JSONL export with the same rules as the AL date
+datatypes, without docassemble.
+
+    al-check-dates intake.csv --date hearing_date --birthdate dob
+    al-check-dates intake.jsonl --birthdate dob --jobs 4 --errors-only
+    al-check-dates intake.json --date hearing_date
+
+Writes one JSON line per row to stdout, e.g.
+`{"row": 3, "valid": false, "errors": {"dob": "future_birthdate"}}`,
+and running counts to stderr. Rows are read, checked and written a chunk
+at a time, so memory use doesn't grow with the size of the file. Exits
+with status 1 if any date was invalid. A `.json` file is one JSON array
+of objects, so it's read all at once. A row that isn't an object gets
+`not_an_object` for each column.
+"""
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import argparse
+import csv
+import datetime
+import io
+import itertools
+import json
+import os
+import sys
+
+from .al_dates import check_dates, current_date
+
+# The error code for every column of a row that isn't a JSON object
+NOT_AN_OBJECT = "not_an_object"
+
+# (row number, {column: error code}) for each row in a chunk
+ChunkResult = List[Tuple[int, Dict[str, str]]]
+
+
+def read_csv_rows(lines: Iterable[str]) -> Iterator[dict]:
+    """Each row of a CSV file with a header line, as a dict."""
+    return csv.DictReader(lines)
+
+
+def read_jsonl_rows(lines: Iterable[str]) -> Iterator[dict]:
+    """Each JSON object in a JSON lines file. Blank lines are skipped."""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_json_rows(lines: Iterable[str]) -> Iterator[dict]:
+    """Each item of a JSON file holding one array. Reads the whole file first."""
+    rows = json.loads("".join(lines))
+    if not isinstance(rows, list):
+        raise ValueError("a .json file has to hold one array of rows")
+    return iter(rows)
+
+
+readers = {
+    "csv": read_csv_rows,
+    "json": read_json_rows,
+    "jsonl": read_jsonl_rows,
+}
+
+
+def guess_format(path: str) -> str:
+    """`csv`, `json` or `jsonl`, from the file's extension. CSV if it's not clear."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".json":
+        return "json"
+    return "csv"
+
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    """`rows` in lists of at most `size`."""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def check_chunk(
+    first_row: int,
+    chunk: Sequence[dict],
+    date_columns: Sequence[str],
+    birthdate_columns: Sequence[str],
+    today_date: datetime.date,
+) -> ChunkResult:
+    """
+    The errors in each row of `chunk`, numbering rows from `first_row`. Each
+    column is checked in one `check_dates` call. Runs in the worker
+    processes, so it only takes plain data.
+    """
+    errors = [{} for _ in chunk]
+    columns = [(column, False) for column in date_columns]
+    columns += [(column, True) for column in birthdate_columns]
+    for column, birthdate in columns:
+        result = check_dates(
+            [row.get(column) if isinstance(row, dict) else None for row in chunk],
+            birthdate=birthdate,
+            today_date=today_date,
+        )
+        for index, code in enumerate(result.codes):
+            if not isinstance(chunk[index], dict):
+                errors[index][column] = NOT_AN_OBJECT
+            elif code is not None:
+                errors[index][column] = code
+    return [(first_row + index, row_errors) for index, row_errors in enumerate(errors)]
+
+
+def check_rows(
+    rows: Iterable[dict],
+    date_columns: Sequence[str] = (),
+    birthdate_columns: Sequence[str] = (),
+    today_date: Optional[datetime.date] = None,
+    jobs: int = 1,
+    chunk_size: int = 5000,
+) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Yield `(row number, {column: error code})` for every row, in order,
+    starting from row 1. With `jobs` above 1, chunks are checked in that many
+    processes, with only a few chunks in flight at once.
+    """
+    if today_date is None:
+        # Decided once, so every worker agrees on what's in the future
+        today_date = current_date()
+    chunks = chunked(rows, chunk_size)
+    starts = itertools.count(1, chunk_size)
+    if jobs <= 1:
+        for first_row, chunk in zip(starts, chunks):
+            yield from check_chunk(first_row, chunk, date_columns, birthdate_columns, today_date)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for first_row, chunk in zip(starts, chunks):
+            pending.append(
+                pool.submit(
+                    check_chunk, first_row, chunk, date_columns, birthdate_columns, today_date
+                )
+            )
+            if len(pending) >= jobs * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def format_counts(rows: int, invalid_rows: int, codes: Counter) -> str:
+    """The running counts line written to stderr."""
+    by_code = ", ".join(f"{code} {count}" for code, count in sorted(codes.items()))
+    return f"{rows} rows, {invalid_rows} with invalid dates" + (f" ({by_code})" if by_code else "")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check the dates in a CSV or JSONL file with the AL date datatype rules."
+    )
+    parser.add_argument("path", help="file to check, or - for stdin")
+    parser.add_argument("--date", action="append", default=[], metavar="COLUMN", help="column to check with the three-part date rules")
+    parser.add_argument("--birthdate", action="append", default=[], metavar="COLUMN", help="column to check with the birthdate rules")
+    parser.add_argument("--format", choices=sorted(readers), help="file format (default: from the extension)")
+    parser.add_argument("--jobs", type=int, default=1, help="processes to check chunks in (default 1)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per chunk (default 5000)")
+    parser.add_argument("--today", type=datetime.date.fromisoformat, help="YYYY-MM-DD to treat as today for birthdates")
+    parser.add_argument("--errors-only", action="store_true", help="only write rows with invalid dates")
+    parser.add_argument("--progress", type=int, default=100000, metavar="ROWS", help="write counts to stderr every ROWS rows (default 100000, 0 for only at the end)")
+    args = parser.parse_args(argv)
+    if not args.date and not args.birthdate:
+        parser.error("give at least one --date or --birthdate column")
+    if args.jobs < 1 or args.chunk_size < 1:
+        parser.error("--jobs and --chunk-size must be at least 1")
+
+    file_format = args.format or guess_format(args.path)
+    if args.path == "-":
+        # The csv module needs newline="", or quoted fields with line breaks break
+        lines = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    else:
+        lines = open(args.path, newline="", encoding="utf-8")
+    rows = 0
+    invalid_rows = 0
+    codes = Counter()
+    try:
+        try:
+            reader = readers[file_format](lines)
+        except ValueError as error:
+            parser.error(f"{args.path}: {error}")
+        if file_format == "csv":
+            missing = [
+                column
+                for column in args.date + args.birthdate
+                if column not in (reader.fieldnames or ())
+            ]
+            if missing:
+                parser.error(f"no such column: {', '.join(missing)}")
+        results = check_rows(
+            reader,
+            date_columns=args.date,
+            birthdate_columns=args.birthdate,
+            today_date=args.today,
+            jobs=args.jobs,
+            chunk_size=args.chunk_size,
+        )
+        for row, errors in results:
+            rows += 1
+            if errors:
+                invalid_rows += 1
+                codes.update(errors.values())
+            if errors or not args.errors_only:
+                sys.stdout.write(json.dumps({"row": row, "valid": not errors, "errors": errors}) + "\n")
+            if args.progress and rows % args.progress == 0:
+                print(format_counts(rows, invalid_rows, codes), file=sys.stderr, flush=True)
+    finally:
+        if args.path == "-":
+            # Leave sys.stdin itself open
+            lines.detach()
+        else:
+            lines.close()
+    print(format_counts(rows, invalid_rows, codes), file=sys.stderr)
+    return 1 if invalid_rows else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
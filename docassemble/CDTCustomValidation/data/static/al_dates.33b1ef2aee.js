@@ -0,0 +1,596 @@
+try {
+var al_date_types = {};
+function register_al_date_type(settings) {
+var current = al_date_types[settings.type];
+if ( current && current.for_page && !settings.for_page ) {
+return;
+}
+al_date_types[settings.type] = settings;
+}
+var queued_al_date_types = window.alDateTypes || [];
+window.alDateTypes = { push: register_al_date_type };
+for (var queued_index = 0; queued_index < queued_al_date_types.length; queued_index++) {
+register_al_date_type(queued_al_date_types[queued_index]);
+}
+var al_date_states = new WeakMap();
+var month_select_template = null;
+function get_month_select_template() {
+if ( month_select_template ) {
+return month_select_template;
+}
+var select = document.createElement('select');
+select.className = 'form-select al-split-date month';
+select.style.width = '7.5em';
+select.appendChild(new Option('', ''));
+var month_format = new Intl.DateTimeFormat('default', { month: 'long' });
+for (var month = 1; month <= 12; month++) {
+var value = month < 10 ? '0' + month : String(month);
+select.appendChild(new Option(month_format.format(new Date(1970, month - 1, 1)), value));
+}
+month_select_template = select;
+return select;
+};
+function al_date_selector() {
+return $.map(Object.keys(al_date_types), function(input_type) {
+return 'input[type="' + input_type + '"]';
+}).join(', ');
+}
+var priorites_date_part = {
+empty: 1,
+out_of_range: 2,
+invalid: 3,
+};
+var priorities_full_date = {
+out_of_range: 1,
+invalid: 2,
+};
+function start_al_dates() {
+install_al_validation();
+hook_al_validator($('#daform').validate({}));
+init_al_dates(document);
+};
+$(document).on('daPageLoad', start_al_dates);
+var al_date_observer = null;
+if ( window.IntersectionObserver ) {
+al_date_observer = new IntersectionObserver(function(entries) {
+entries.forEach(function(entry) {
+if ( entry.isIntersecting ) {
+al_date_observer.unobserve(entry.target);
+build_al_date(entry.target);
+}
+});
+}, { rootMargin: '200px 0px' });
+}
+function init_al_dates(root) {
+var selector = al_date_selector();
+if ( !selector ) {
+return;
+}
+var inputs = $(root).find(selector).addBack(selector);
+inputs.each(function() {
+if ( al_date_observer && !document.getElementById(this.id + '-parent') ) {
+al_date_observer.observe(this);
+} else {
+build_al_date(this);
+}
+});
+};
+if ( window.MutationObserver ) {
+new MutationObserver(function(mutations) {
+for (var mutation_index = 0; mutation_index < mutations.length; mutation_index++) {
+var added = mutations[ mutation_index ].addedNodes;
+for (var node_index = 0; node_index < added.length; node_index++) {
+if ( added[ node_index ].nodeType === 1 ) {
+init_al_dates(added[ node_index ]);
+}
+}
+}
+}).observe(document.documentElement, { childList: true, subtree: true });
+}
+$(document).on('focusin', 'input', function(event) {
+if ( !al_date_types[ $(this).attr('type') ] ) {
+return;
+}
+if ( al_date_observer ) {
+al_date_observer.unobserve(this);
+}
+var state = build_al_date(this);
+if ( state ) {
+state.month.focus();
+}
+});
+document.addEventListener('submit', function(event) {
+var selector = al_date_selector();
+if ( !selector ) {
+return;
+}
+$(event.target).find(selector).each(function() {
+if ( al_date_observer ) {
+al_date_observer.unobserve(this);
+}
+build_al_date(this);
+});
+}, true);
+function build_al_date(dateElement) {
+if ( al_date_states.has(dateElement) || !al_date_types[ $(dateElement).attr('type') ] ) {
+return null;
+}
+var settings = al_date_types[$(dateElement).attr('type')];
+$(dateElement).hide();
+$(dateElement).attr('type', 'hidden');
+$(dateElement).attr('aria-hidden', 'true');
+var almin = $(dateElement).attr('data-almin');
+var almax = $(dateElement).attr('data-almax');
+var adopted = adopt_al_date(dateElement);
+var parts = adopted || build_al_date_parts(dateElement, settings);
+var state = {
+input: dateElement,
+parent: parts.parent,
+month: parts.month,
+day: parts.day,
+year: parts.year,
+has_min: almin !== undefined,
+has_max: almax !== undefined,
+min: get_al_bound_day(almin),
+max: get_al_bound_day(almax),
+min_message: $(dateElement).attr('data-alminmessage'),
+max_message: $(dateElement).attr('data-almaxmessage'),
+exclude: get_al_calendar($(dateElement).attr('data-alexclude')),
+exclude_message: $(dateElement).attr('data-alexcludemessage'),
+min_age: parseInt($(dateElement).attr('data-alminage'), 10),
+max_age: parseInt($(dateElement).attr('data-almaxage'), 10),
+min_age_message: $(dateElement).attr('data-alminagemessage'),
+max_age_message: $(dateElement).attr('data-almaxagemessage'),
+rules: settings.rules,
+left: false,
+code: null,
+};
+al_date_states.set(state.parent, state);
+al_date_states.set(state.month, state);
+al_date_states.set(state.day, state);
+al_date_states.set(state.year, state);
+al_date_states.set(dateElement, state);
+if ( adopted ) {
+update_date(state);
+}
+return state;
+};
+function adopt_al_date(dateElement) {
+var parent = document.getElementById(dateElement.id + '-parent');
+if ( !parent || !$(parent).hasClass('al-split-date-parent') ) {
+return null;
+}
+$(dateElement).before(parent);
+var parts = {
+parent: parent,
+month: document.getElementById(dateElement.id + '-month'),
+day: document.getElementById(dateElement.id + '-day'),
+year: document.getElementById(dateElement.id + '-year'),
+};
+var required = $(dateElement).closest('.da-form-group').hasClass('darequired');
+var partElements = $([ parts.month, parts.day, parts.year ]);
+partElements.attr( 'required', required );
+partElements.prop( 'required', required );
+return parts;
+};
+function build_al_date_parts(dateElement, settings) {
+var labels = settings.labels;
+var required = $(dateElement).closest('.da-form-group').hasClass('darequired');
+var parentElement = $('<div class="form-row row al-split-date-parent">');
+var monthId = dateElement.id + '-month';
+var monthParent = $('<div class="col">');
+var monthLabel = $('<label style="text-align:center">').text(labels.month);
+monthLabel.attr( 'for', monthId );
+var monthElement = $(get_month_select_template().cloneNode(true));
+monthElement.addClass(dateElement.id);
+monthElement.attr( 'id', monthId );
+monthElement.attr( 'required', required );
+monthElement.prop( 'required', required );
+var dayId = dateElement.id + '-day';
+var dayParent = $('<div class="col">');
+var dayLabel = $('<label style="text-align:center">').text(labels.day);
+dayLabel.attr( 'for', dayId );
+var dayElement = $('<input class="form-control day al-split-date ' + dateElement.id + '" type="number" min="1" max="31">' );
+dayElement.attr( 'id', dayId );
+dayElement.attr( 'required', required );
+dayElement.prop( 'required', required );
+var yearId = dateElement.id + '-year';
+var yearParent = $('<div class="col">');
+var yearLabel = $('<label style="text-align:center">').text(labels.year);
+yearLabel.attr( 'for', yearId );
+var yearElement = $('<input class="form-control year al-split-date ' + dateElement.id + '" type="number">');
+yearElement.attr( 'id', yearId );
+yearElement.attr( 'required', required );
+yearElement.prop( 'required', required );
+var errorElement = $('<span id="' + dateElement.id + '-error" class="da-has-error invalid-feedback al-split-date error"></div>');
+var dateParts;
+if ( $(dateElement).val() ) {
+dateParts = $(dateElement).val().split( '/' );
+dateParts.forEach( function( part, index, dateParts ) {
+var partInt = parseInt( part );
+if (isNaN(partInt)) {
+dateParts[ index ] = '';
+} else {
+dateParts[ index ] = partInt;
+}
+});
+} else {
+dateParts = null;
+}
+if ( dateParts && dateParts[ 0 ] >= 1 && dateParts[ 0 ] <= 12 ) {
+monthElement[0].options[ dateParts[ 0 ] ].setAttribute('selected', 'selected');
+}
+if ( dateParts ) {
+dayElement.val( dateParts[ 1 ]);
+yearElement.val( dateParts[ 2 ]);
+}
+$(dateElement).before(parentElement);
+$(monthParent).append(monthLabel);
+$(monthParent).append(monthElement);
+$(parentElement).append(monthParent);
+$(dayParent).append(dayLabel);
+$(dayParent).append(dayElement);
+$(parentElement).append(dayParent);
+$(yearParent).append(yearLabel);
+$(yearParent).append(yearElement);
+$(parentElement).append(yearParent);
+$(parentElement).append(errorElement);
+return {
+parent: parentElement[0],
+month: monthElement[0],
+day: dayElement[0],
+year: yearElement[0],
+};
+};
+var al_validation_installed = false;
+function install_al_validation() {
+if ( al_validation_installed ) {
+return;
+}
+al_validation_installed = true;
+$.validator.addClassRules('al-split-date', {
+aldate: true,
+alexclude: true,
+alfuture: true,
+alage: true,
+almin: true,
+almax: true,
+});
+$.validator.addMethod('aldate', function(value, element, params) {
+var state = al_date_states.get(element);
+if (!state || !state.rules) {
+return true;
+}
+state.code = al_date_code(state);
+if ( state.code && !state.left && state.rules.empty_part_codes.indexOf(state.code) !== -1 ) {
+return true;
+}
+return !state.code;
+}, function(params, element) {
+var state = al_date_states.get(element);
+var data = get_date_data(state);
+var message = state.rules.messages[state.code] || '';
+return message.replace('{}', data.month + '/' + data.day + '/' + data.year);
+});
+$.validator.addMethod('alexclude', function(value, element, params) {
+var state = al_date_states.get(element);
+if (!state || !state.exclude || !al_has_check(state, 'check_allowed_day')) {
+return true;
+}
+var checked = al_check_date(state);
+return checked.day === null || !al_day_excluded(state.exclude, checked.day);
+}, function(params, element) {
+var state = al_date_states.get(element);
+if (state.exclude_message) {
+return state.exclude_message;
+}
+var data = get_date_data(state);
+var next = al_next_allowed_day(state.exclude, get_al_epoch_day(data));
+var next_text = '';
+if ( next !== null ) {
+var next_date = new Date(next * 86400000);
+next_text = ('0' + (next_date.getUTCMonth() + 1)).slice(-2) + '/'
++ ('0' + next_date.getUTCDate()).slice(-2) + '/' + next_date.getUTCFullYear();
+}
+return state.rules.messages[state.rules.excluded_day]
+.replace('{}', data.month + '/' + data.day + '/' + data.year)
+.replace('{}', next_text);
+});
+$.validator.addMethod('alage', function(value, element, params) {
+var state = al_date_states.get(element);
+if (!state || (isNaN(state.min_age) && isNaN(state.max_age))
+|| !al_has_check(state, 'check_age_limits') || al_check_date(state).day === null) {
+return true;
+}
+state.age_code = al_age_code(state);
+return !state.age_code;
+}, function(params, element) {
+var state = al_date_states.get(element);
+if ( state.age_code === state.rules.below_min_age ) {
+return state.min_age_message
+|| state.rules.messages[state.age_code].replace('{}', state.min_age);
+}
+return state.max_age_message
+|| state.rules.messages[state.age_code].replace('{}', state.max_age);
+});
+$.validator.addMethod('alfuture', function(value, element, params) {
+var state = al_date_states.get(element);
+if (!state || !al_has_check(state, 'check_not_in_future')) {
+return true;
+}
+var checked = al_check_date(state);
+return checked.day === null || checked.day <= get_al_today_day();
+}, function(params, element) {
+var state = al_date_states.get(element);
+var data = get_date_data(state);
+return state.rules.messages[state.rules.future_birthdate]
+.replace('{}', data.month + '/' + data.day + '/' + data.year);
+});
+$.validator.addMethod('almin', function(value, element, params) {
+var state = al_date_states.get(element);
+if (!state || !state.has_min || isNaN(state.min) || !al_has_check(state, 'check_min')) {
+return true;
+}
+var checked = al_check_date(state);
+return checked.day === null || checked.day >= state.min;
+}, function(params, element) {
+var state = al_date_states.get(element);
+return state.min_message || state.rules.messages[state.rules.below_min];
+});
+$.validator.addMethod('almax', function(value, element, params) {
+var state = al_date_states.get(element);
+if (!state || !state.has_max || isNaN(state.max) || !al_has_check(state, 'check_max')) {
+return true;
+}
+var checked = al_check_date(state);
+return checked.day === null || checked.day <= state.max;
+}, function(params, element) {
+var state = al_date_states.get(element);
+return state.max_message || state.rules.messages[state.rules.above_max];
+});
+};
+function hook_al_validator(validator) {
+if ( !validator || validator.al_dates_hooked ) {
+return;
+}
+validator.al_dates_hooked = true;
+var originalErrorPlacement = validator.settings.errorPlacement;
+validator.settings.errorPlacement = function(error, element) {
+var state = al_date_states.get(element[0] || element);
+if (!state) {
+if ( originalErrorPlacement ) {
+originalErrorPlacement(error, element);
+} else {
+error.insertAfter(element);
+}
+return;
+}
+var $parent = $(state.parent);
+$($parent.find('span.invalid-feedback')).remove();
+$(error).appendTo($parent);
+};
+var originalHighlight = validator.settings.highlight;
+validator.settings.highlight = function(element, errorClass, validClass) {
+var state = al_date_states.get(element);
+if (state) {
+$(state.parent).addClass('invalid');
+}
+originalHighlight.call(this, element, errorClass, validClass);
+};
+var originalUnhighlight = validator.settings.unhighlight;
+validator.settings.unhighlight = function(element, errorClass, validClass) {
+var state = al_date_states.get(element);
+if (state) {
+$(state.parent).removeClass('invalid');
+}
+originalUnhighlight.call(this, element, errorClass, validClass);
+};
+};
+$(document).on('change', '#daform .al-split-date', function(event) {
+var element = this;
+var state = al_date_states.get(element);
+if (!state) {
+return;
+}
+update_date(state);
+hook_al_validator($('#daform').data('validator'));
+if ( state.left && element !== state.year ) {
+$(state.year).valid();
+}
+if ( $(element).data('al-validation-ready') ) {
+return;
+}
+$(element).data('al-validation-ready', true);
+$(element).valid();
+});
+$(document).on('focusout', '#daform .al-split-date-parent', function(event) {
+var state = al_date_states.get(this);
+if ( !state || state.parent.contains(event.relatedTarget) ) {
+return;
+}
+state.left = true;
+if ( state.year.value !== '' || state.month.value !== '' || state.day.value !== '' ) {
+hook_al_validator($('#daform').data('validator'));
+$(state.year).valid();
+}
+});
+function update_date(state) {
+var data = get_date_data(state);
+var val = data.month + '/' + data.day + '/' + data.year;
+if ( val === '//' ) {
+val = '';
+}
+state.input.value = val;
+};
+function al_has_check(state, name) {
+return state.rules.checks.indexOf(name) !== -1;
+}
+function al_check_date(state) {
+var rules = state.rules;
+var data = get_date_data(state);
+var item = data.month + '/' + data.day + '/' + data.year;
+if ( item === '//' ) {
+return { code: null, day: null };
+}
+if ( al_has_check(state, 'check_complete') ) {
+var mask = (data.month === '' ? 4 : 0) + (data.day === '' ? 2 : 0) + (data.year === '' ? 1 : 0);
+if ( rules.empty_part_codes[ mask ] ) {
+return { code: rules.empty_part_codes[ mask ], day: null };
+}
+}
+var match = new RegExp(rules.pattern).exec(item);
+if ( !match ) {
+return { code: al_has_check(state, 'check_shape') ? rules.malformed : null, day: null };
+}
+if ( !al_has_check(state, 'check_calendar') ) {
+return { code: null, day: null };
+}
+var month = parseInt(match[1], 10);
+var day = parseInt(match[2], 10);
+var year = parseInt(match[3], 10);
+var is_leap = (year % 4 === 0) && ((year % 100 !== 0) || (year % 400 === 0));
+if ( month < 1 || month > 12 || year < 1 ) {
+return { code: rules.invalid_date, day: null };
+}
+var days_in_month = rules.month_lengths[ month ] + ((is_leap && month === 2) ? 1 : 0);
+if ( day < 1 || day > days_in_month ) {
+return { code: rules.invalid_date, day: null };
+}
+return { code: null, day: get_al_epoch_day(data) };
+};
+function al_date_code(state) {
+return al_check_date(state).code;
+};
+function al_age_code(state) {
+var data = get_date_data(state);
+var now = new Date();
+var today_key = now.getFullYear() * 10000 + (now.getMonth() + 1) * 100 + now.getDate();
+var birth_key = parseInt(data.year, 10) * 10000 + parseInt(data.month, 10) * 100 + parseInt(data.day, 10);
+var age = Math.floor((today_key - birth_key) / 10000);
+if ( age < state.min_age ) {
+return state.rules.below_min_age;
+}
+if ( age > state.max_age ) {
+return state.rules.above_max_age;
+}
+return null;
+};
+var al_calendars = {};
+function get_al_calendar(token) {
+if ( !token ) {
+return null;
+}
+if ( al_calendars[ token ] ) {
+return al_calendars[ token ];
+}
+var parts = token.split('.');
+if ( parts.length !== 4 ) {
+return null;
+}
+var raw = atob(parts[3]);
+var bits = new Uint8Array(raw.length);
+for (var index = 0; index < raw.length; index++) {
+bits[index] = raw.charCodeAt(index);
+}
+var calendar = {
+start: parseInt(parts[0], 10),
+days: Math.min(parseInt(parts[1], 10), bits.length * 8),
+weekdays: parseInt(parts[2], 10),
+bits: bits,
+};
+al_calendars[ token ] = calendar;
+return calendar;
+};
+function get_al_epoch_day(data) {
+var time = Date.UTC(parseInt(data.year, 10), parseInt(data.month, 10) - 1, parseInt(data.day, 10));
+if ( isNaN(time) ) {
+return null;
+}
+var year = parseInt(data.year, 10);
+if ( year < 100 ) {
+var date = new Date(time);
+date.setUTCFullYear(year);
+time = date.getTime();
+}
+return Math.round(time / 86400000);
+};
+function get_al_today_day() {
+var now = new Date();
+return get_al_epoch_day({ year: now.getFullYear(), month: now.getMonth() + 1, day: now.getDate() });
+};
+function get_al_bound_day(text) {
+if ( !text ) {
+return NaN;
+}
+var match = /^\s*(\d{4})-(\d{1,2})-(\d{1,2})/.exec(text);
+var day = null;
+if ( match ) {
+day = get_al_epoch_day({ year: match[1], month: match[2], day: match[3] });
+} else if ( (match = /^\s*(\d{1,2})\/(\d{1,2})\/(\d{4})\s*$/.exec(text)) ) {
+day = get_al_epoch_day({ year: match[3], month: match[1], day: match[2] });
+} else {
+var date = new Date(text);
+if ( !isNaN(date) ) {
+day = get_al_epoch_day({ year: date.getFullYear(), month: date.getMonth() + 1, day: date.getDate() });
+}
+}
+return day === null ? NaN : day;
+};
+function al_weekday_excluded(calendar, day) {
+return Boolean((calendar.weekdays >> (((day + 3) % 7 + 7) % 7)) & 1);
+}
+function al_day_excluded(calendar, day) {
+var offset = day - calendar.start;
+if ( offset >= 0 && offset < calendar.days ) {
+return Boolean((calendar.bits[ offset >> 3 ] >> (offset & 7)) & 1);
+}
+return al_weekday_excluded(calendar, day);
+};
+function al_next_allowed_day(calendar, day) {
+if ( day === null || (calendar.weekdays & 127) === 127 ) {
+return null;
+}
+var end = calendar.start + calendar.days;
+while ( day < end ) {
+var offset = day - calendar.start;
+if ( offset < 0 ) {
+if ( !al_weekday_excluded(calendar, day) ) {
+return day;
+}
+day += 1;
+continue;
+}
+var index = offset >> 3;
+var shift = offset & 7;
+var span = Math.min(32 - shift, calendar.days - offset);
+var word = 0;
+for (var part = 0; part < 4 && index + part < calendar.bits.length; part++) {
+word |= calendar.bits[ index + part ] << (part * 8);
+}
+var free = ~(word >>> shift) & (span === 32 ? -1 : (1 << span) - 1);
+if ( free ) {
+return day + 31 - Math.clz32(free & -free);
+}
+day += span;
+}
+while ( al_weekday_excluded(calendar, day) ) {
+day += 1;
+}
+return day;
+};
+function get_date_data (state) {
+return {
+year: state.year.value,
+month: state.month.value,
+day: state.day.value,
+};
+};
+var al_late_validator = $('#daform').data('validator');
+if ( al_late_validator ) {
+install_al_validation();
+hook_al_validator(al_late_validator);
+init_al_dates(document);
+}
+} catch (error) {
+console.error('Error in AL date CusotmDataTypes', error);
+}
@@ -0,0 +1,879 @@
+
+/* Validation priority (https://design-system.service.gov.uk/components/date-input/#error-messages):
+*  missing or incomplete information (when parent is no longer in focus, highlight fields missing info?)
+*  information that cannot be correct (for example, the number ‘13’ in the month field)
+*  information that fails validation for another reason
+*     (note: maybe less than 4 digits in year, too)
+*/
+
+/* Shared runtime for the AL three-part date datatypes. Each datatype's
+*  `javascript` is only a bootstrap line that queues its settings, e.g.
+*  (window.alDateTypes = window.alDateTypes || []).push({type: "ALBirthDateTestValidation", labels: {...}});
+*  Include this file with `features: javascript: al_dates.js`, next to al_dates.css,
+*  or its minified copy with `asset_tags()`. Run the assets module after editing it.
+*/
+
+// da doesn't log the full error sometimes, so we'll do our own try/catch
+try {
+
+// Settings for each registered input type, keyed by the `type` attribute
+// docassemble gives the datatype's inputs
+var al_date_types = {};
+
+function register_al_date_type(settings) {
+  // Settings in the page's language, from `asset_tags()`, win over the
+  // datatype's own, which only has the language the server started in
+  var current = al_date_types[settings.type];
+  if ( current && current.for_page && !settings.for_page ) {
+    return;
+  }
+  al_date_types[settings.type] = settings;
+}
+
+// Bootstrap lines that ran before this file loaded left their settings in a
+// list. Later ones call our `push` directly.
+var queued_al_date_types = window.alDateTypes || [];
+window.alDateTypes = { push: register_al_date_type };
+for (var queued_index = 0; queued_index < queued_al_date_types.length; queued_index++) {
+  register_al_date_type(queued_al_date_types[queued_index]);
+}
+
+// Each date part, and the parent around them, maps to its field's state, so
+// validation doesn't have to search the DOM for the other parts
+var al_date_states = new WeakMap();
+
+// The month <select> with every month's name in it. Built the first time a
+// widget needs it, then cloned for every widget after that.
+var month_select_template = null;
+
+function get_month_select_template() {
+  /** Return the month <select> to clone for each widget */
+  if ( month_select_template ) {
+    return month_select_template;
+  }
+  var select = document.createElement('select');
+  select.className = 'form-select al-split-date month';
+  select.style.width = '7.5em';
+  // "No month selected" option
+  select.appendChild(new Option('', ''));
+  // Add every calendar month (based on user's computer's date system? lanugage?)
+  var month_format = new Intl.DateTimeFormat('default', { month: 'long' });
+  for (var month = 1; month <= 12; month++) {
+    var value = month < 10 ? '0' + month : String(month);
+    select.appendChild(new Option(month_format.format(new Date(1970, month - 1, 1)), value));
+  }
+  month_select_template = select;
+  return select;
+};  // Ends get_month_select_template()
+
+function al_date_selector() {
+  /** Selector for the original inputs of every registered date type */
+  return $.map(Object.keys(al_date_types), function(input_type) {
+    return 'input[type="' + input_type + '"]';
+  }).join(', ');
+}
+
+// https://design-system.service.gov.uk/components/date-input/#error-messages
+var priorites_date_part = {
+  empty: 1,
+  out_of_range: 2,
+  invalid: 3,  // Maybe non-4-digit year
+};
+
+var priorities_full_date = {
+  // Multiple or non-determinate out of range, max, min
+  out_of_range: 1,
+  invalid: 2,
+};
+
+function start_al_dates() {
+  // Custom validation
+  // We can't use `$("#myform").validate({rules:{...} })
+  // etc. because it needs names and we don't have them here.
+  install_al_validation();
+  hook_al_validator($('#daform').validate({}));
+
+  init_al_dates(document);
+};  // Ends start_al_dates()
+
+$(document).on('daPageLoad', start_al_dates);
+
+// -- Building widgets, lazily --
+
+// Widgets are only built when their field is about to scroll into view or
+// gets focus, so long pages and fields hidden by `show if` cost nothing up
+// front. Until then the original input keeps the answer.
+var al_date_observer = null;
+if ( window.IntersectionObserver ) {
+  al_date_observer = new IntersectionObserver(function(entries) {
+    entries.forEach(function(entry) {
+      if ( entry.isIntersecting ) {
+        al_date_observer.unobserve(entry.target);
+        build_al_date(entry.target);
+      }
+    });
+  }, { rootMargin: '200px 0px' });
+}
+
+function init_al_dates(root) {
+  /** Get every unbuilt date input in `root` (including itself) ready to build */
+  var selector = al_date_selector();
+  if ( !selector ) {
+    return;
+  }
+  var inputs = $(root).find(selector).addBack(selector);
+  inputs.each(function() {
+    // Adopting a widget the server rendered is cheap, so don't wait
+    if ( al_date_observer && !document.getElementById(this.id + '-parent') ) {
+      al_date_observer.observe(this);
+    } else {
+      build_al_date(this);
+    }
+  });
+};  // Ends init_al_dates()
+
+// Date inputs docassemble adds to the page later get the same treatment
+if ( window.MutationObserver ) {
+  new MutationObserver(function(mutations) {
+    for (var mutation_index = 0; mutation_index < mutations.length; mutation_index++) {
+      var added = mutations[ mutation_index ].addedNodes;
+      for (var node_index = 0; node_index < added.length; node_index++) {
+        if ( added[ node_index ].nodeType === 1 ) {
+          init_al_dates(added[ node_index ]);
+        }
+      }
+    }
+  }).observe(document.documentElement, { childList: true, subtree: true });
+}
+
+// Someone tabbing into a field before it was built gets the widget right away
+$(document).on('focusin', 'input', function(event) {
+  if ( !al_date_types[ $(this).attr('type') ] ) {
+    return;
+  }
+  if ( al_date_observer ) {
+    al_date_observer.unobserve(this);
+  }
+  var state = build_al_date(this);
+  if ( state ) {
+    state.month.focus();
+  }
+});  // ends on focusin
+
+// Build whatever is left before jQuery Validate checks the form on submit.
+// Listening while the event comes down to the form lets this run first.
+document.addEventListener('submit', function(event) {
+  var selector = al_date_selector();
+  if ( !selector ) {
+    return;
+  }
+  $(event.target).find(selector).each(function() {
+    if ( al_date_observer ) {
+      al_date_observer.unobserve(this);
+    }
+    build_al_date(this);
+  });
+}, true);  // ends on submit
+
+//this is an adaptation of Jonathan Pyle's datereplace.js
+function build_al_date(dateElement) {
+  /**
+  * Replace a date input with the month, day and year widget, filled in from
+  * the input's value. Returns the widget's state, or null if it was
+  * already built.
+  */
+  if ( al_date_states.has(dateElement) || !al_date_types[ $(dateElement).attr('type') ] ) {
+    return null;
+  }
+  var settings = al_date_types[$(dateElement).attr('type')];
+  $(dateElement).hide();
+  $(dateElement).attr('type', 'hidden');
+  $(dateElement).attr('aria-hidden', 'true');
+  
+  // Avoid .data - it turns some values, like a bare year, into numbers
+  // https://forum.jquery.com/topic/jquery-data-caching-of-data-attributes
+  // https://stackoverflow.com/a/8708345/14144258
+  var almin = $(dateElement).attr('data-almin');
+  var almax = $(dateElement).attr('data-almax');
+  
+  // The server may have rendered the widget already (see `widget_html()`
+  // in ALCustomDateTestValidation.py). Then there's nothing to build.
+  var adopted = adopt_al_date(dateElement);
+  var parts = adopted || build_al_date_parts(dateElement, settings);
+  
+  // -- State for validation --
+  var state = {
+    input: dateElement,
+    parent: parts.parent,
+    month: parts.month,
+    day: parts.day,
+    year: parts.year,
+    has_min: almin !== undefined,
+    has_max: almax !== undefined,
+    // Bounds as days from 1970-01-01, like `get_al_epoch_day()`. NaN if
+    // missing or invalid.
+    // TODO: Catch invalid min dates? Useful for devs. Otherwise very hard to track down.
+    min: get_al_bound_day(almin),
+    max: get_al_bound_day(almax),
+    min_message: $(dateElement).attr('data-alminmessage'),
+    max_message: $(dateElement).attr('data-almaxmessage'),
+    // Days the answer can't be, from `exclusion_token()`. null if none.
+    exclude: get_al_calendar($(dateElement).attr('data-alexclude')),
+    exclude_message: $(dateElement).attr('data-alexcludemessage'),
+    // Age limits in whole years. NaN if missing.
+    min_age: parseInt($(dateElement).attr('data-alminage'), 10),
+    max_age: parseInt($(dateElement).attr('data-almaxage'), 10),
+    min_age_message: $(dateElement).attr('data-alminagemessage'),
+    max_age_message: $(dateElement).attr('data-almaxagemessage'),
+    // The server's completeness and calendar rules, from the datatype
+    rules: settings.rules,
+    // Whether the user has left the whole date field yet. Until then,
+    // don't complain that it's incomplete.
+    left: false,
+    // The code of the last failed `aldate` check, for its message
+    code: null,
+  };
+  al_date_states.set(state.parent, state);
+  al_date_states.set(state.month, state);
+  al_date_states.set(state.day, state);
+  al_date_states.set(state.year, state);
+  // Marks the original input as built
+  al_date_states.set(dateElement, state);
+  if ( adopted ) {
+    // Whatever is in the parts now, maybe typed before this script ran, is the answer
+    update_date(state);
+  }
+  return state;
+};  // Ends build_al_date()
+
+function adopt_al_date(dateElement) {
+  /**
+  * Move the widget the server rendered for this input, if there is one,
+  * into place. Returns its parts, or null.
+  */
+  var parent = document.getElementById(dateElement.id + '-parent');
+  if ( !parent || !$(parent).hasClass('al-split-date-parent') ) {
+    return null;
+  }
+  $(dateElement).before(parent);
+  var parts = {
+    parent: parent,
+    month: document.getElementById(dateElement.id + '-month'),
+    day: document.getElementById(dateElement.id + '-day'),
+    year: document.getElementById(dateElement.id + '-year'),
+  };
+  // Whether the field is required is the page's to say, same as when building
+  var required = $(dateElement).closest('.da-form-group').hasClass('darequired');
+  var partElements = $([ parts.month, parts.day, parts.year ]);
+  partElements.attr( 'required', required );
+  partElements.prop( 'required', required );
+  return parts;
+};  // Ends adopt_al_date()
+
+function build_al_date_parts(dateElement, settings) {
+  /** Build the widget's elements and put them before the input. Returns its parts. */
+  var labels = settings.labels;
+  var required = $(dateElement).closest('.da-form-group').hasClass('darequired');
+  
+  //Construct the input components
+  var parentElement = $('<div class="form-row row al-split-date-parent">');
+  
+  // TODO: Set names of inputs to same as ids of inputs, then use
+  // the other things that go with it, like `for`. We might then
+  // be able to make a jQuery validation plugin `group`. Still not sure
+  // `group` is useful since we need to sometimes treat the fields
+  // individually. https://stackoverflow.com/a/14147170/14144258
+  // TODO: Check out `ignore: ''` https://stackoverflow.com/questions/13692061/using-the-jquery-validate-plugin-to-check-if-one-or-more-checkboxes-with-differ#comment18861816_13708252
+  // That might break docassemble things, though, if we can't make it specific
+  // to just these fields.
+  
+  var monthId = dateElement.id + '-month';
+  var monthParent = $('<div class="col">');
+  var monthLabel = $('<label style="text-align:center">').text(labels.month);
+  monthLabel.attr( 'for', monthId );
+  var monthElement = $(get_month_select_template().cloneNode(true));
+  monthElement.addClass(dateElement.id);
+  monthElement.attr( 'id', monthId );
+  monthElement.attr( 'required', required );
+  monthElement.prop( 'required', required );
+  
+  var dayId = dateElement.id + '-day';
+  var dayParent = $('<div class="col">');
+  var dayLabel = $('<label style="text-align:center">').text(labels.day);
+  dayLabel.attr( 'for', dayId );
+  // Reconsider type `number`
+  // https://github.com/alphagov/govuk-design-system-backlog/issues/42#issuecomment-409848587
+  // `inputmode` ("numeric") not fully supported yet (02/09/2023)
+  // Avoid `pattern` - voice control will enter invalid input (https://github.com/alphagov/govuk-design-system-backlog/issues/42#issuecomment-775103437)
+  var dayElement = $('<input class="form-control day al-split-date ' + dateElement.id + '" type="number" min="1" max="31">' );
+  dayElement.attr( 'id', dayId );
+  dayElement.attr( 'required', required );
+  dayElement.prop( 'required', required );
+  
+  var yearId = dateElement.id + '-year';
+  var yearParent = $('<div class="col">');
+  var yearLabel = $('<label style="text-align:center">').text(labels.year);
+  yearLabel.attr( 'for', yearId );
+  //Do not restrict year input range for now.
+  // Reconsider type `number`
+  // https://github.com/alphagov/govuk-design-system-backlog/issues/42#issuecomment-409848587
+  // `inputmode` ("numeric") not fully supported yet (02/09/2023)
+  // Avoid `pattern` - voice control will enter invalid input (https://github.com/alphagov/govuk-design-system-backlog/issues/42#issuecomment-775103437)
+  var yearElement = $('<input class="form-control year al-split-date ' + dateElement.id + '" type="number">');
+  yearElement.attr( 'id', yearId );
+  yearElement.attr( 'required', required );
+  yearElement.prop( 'required', required );
+  
+  // TODO: try removing this
+  var errorElement = $('<span id="' + dateElement.id + '-error" class="da-has-error invalid-feedback al-split-date error"></div>');
+    
+  // If we're returning to a variable that has already been defined
+  // prepare to use that variable's values
+  var dateParts;
+  if ( $(dateElement).val() ) {
+    dateParts = $(dateElement).val().split( '/' );
+    dateParts.forEach( function( part, index, dateParts ) {
+      var partInt = parseInt( part );
+      if (isNaN(partInt)) {
+        dateParts[ index ] = '';
+      } else {
+        dateParts[ index ] = partInt;
+      }
+    });
+  } else {
+    dateParts = null;
+  }
+      
+  // Insert previous answers if possible
+  
+  // -- Month --
+  // Use previous values if possible. Option 0 is "no month selected",
+  // so month n is option n.
+  if ( dateParts && dateParts[ 0 ] >= 1 && dateParts[ 0 ] <= 12 ) {
+    monthElement[0].options[ dateParts[ 0 ] ].setAttribute('selected', 'selected');
+  }
+
+  // -- Day and year --
+  // Use previous values if possible
+  if ( dateParts ) {
+    dayElement.val( dateParts[ 1 ]);
+    yearElement.val( dateParts[ 2 ]);
+  }
+  
+  // -- Add elements to DOM --
+  
+  $(dateElement).before(parentElement); 
+  $(monthParent).append(monthLabel);
+  $(monthParent).append(monthElement);
+  $(parentElement).append(monthParent); 
+  $(dayParent).append(dayLabel);
+  $(dayParent).append(dayElement);
+  $(parentElement).append(dayParent); 
+  $(yearParent).append(yearLabel);
+  $(yearParent).append(yearElement);
+  $(parentElement).append(yearParent);
+  // TODO: try removing this
+  $(parentElement).append(errorElement);
+  
+  return {
+    parent: parentElement[0],
+    month: monthElement[0],
+    day: dayElement[0],
+    year: yearElement[0],
+  };
+};  // Ends build_al_date_parts()
+
+// -- Validation, installed once per page lifetime --
+
+var al_validation_installed = false;
+
+function install_al_validation() {
+  /** Register our rules and methods with jQuery Validate. Only the first call does anything. */
+  if ( al_validation_installed ) {
+    return;
+  }
+  al_validation_installed = true;
+  
+  // No jQuery validation for original field, since it doesn't work on hidden
+  // elements last time we tried
+
+  // Every date part gets the min and max rules through its class, instead
+  // of a `rules('add')` call per element. The methods themselves skip
+  // fields that have no bound.
+  $.validator.addClassRules('al-split-date', {
+    aldate: true,
+    alexclude: true,
+    alfuture: true,
+    alage: true,
+    almin: true,
+    almax: true,
+  });
+
+  // Missing parts and impossible dates, by the same rules as the server's
+  // `validate`. See `client_rules()` in ALCustomDateTestValidation.py.
+  $.validator.addMethod('aldate', function(value, element, params) {
+    var state = al_date_states.get(element);
+    if (!state || !state.rules) {
+      return true;
+    }
+    state.code = al_date_code(state);
+    if ( state.code && !state.left && state.rules.empty_part_codes.indexOf(state.code) !== -1 ) {
+      // Still filling it in
+      return true;
+    }
+    return !state.code;
+  }, function(params, element) {
+    var state = al_date_states.get(element);
+    var data = get_date_data(state);
+    var message = state.rules.messages[state.code] || '';
+    return message.replace('{}', data.month + '/' + data.day + '/' + data.year);
+  });
+
+  // Days the field's exclusion calendar rules out, e.g. weekends and
+  // court holidays. See `ExclusionCalendar` in al_dates.py.
+  $.validator.addMethod('alexclude', function(value, element, params) {
+    var state = al_date_states.get(element);
+    if (!state || !state.exclude || !al_has_check(state, 'check_allowed_day')) {
+      return true;
+    }
+    var checked = al_check_date(state);
+    return checked.day === null || !al_day_excluded(state.exclude, checked.day);
+  }, function(params, element) {
+    var state = al_date_states.get(element);
+    if (state.exclude_message) {
+      return state.exclude_message;
+    }
+    var data = get_date_data(state);
+    var next = al_next_allowed_day(state.exclude, get_al_epoch_day(data));
+    var next_text = '';
+    if ( next !== null ) {
+      var next_date = new Date(next * 86400000);
+      next_text = ('0' + (next_date.getUTCMonth() + 1)).slice(-2) + '/'
+        + ('0' + next_date.getUTCDate()).slice(-2) + '/' + next_date.getUTCFullYear();
+    }
+    return state.rules.messages[state.rules.excluded_day]
+      .replace('{}', data.month + '/' + data.day + '/' + data.year)
+      .replace('{}', next_text);
+  });
+
+  // Age limits on birthdates, compared as YYYYMMDD integers the same way
+  // as `age_on()` in al_dates.py
+  $.validator.addMethod('alage', function(value, element, params) {
+    var state = al_date_states.get(element);
+    if (!state || (isNaN(state.min_age) && isNaN(state.max_age))
+        || !al_has_check(state, 'check_age_limits') || al_check_date(state).day === null) {
+      return true;
+    }
+    state.age_code = al_age_code(state);
+    return !state.age_code;
+  }, function(params, element) {
+    var state = al_date_states.get(element);
+    if ( state.age_code === state.rules.below_min_age ) {
+      return state.min_age_message
+        || state.rules.messages[state.age_code].replace('{}', state.min_age);
+    }
+    return state.max_age_message
+      || state.rules.messages[state.age_code].replace('{}', state.max_age);
+  });
+
+  // A date after today, for datatypes with the server's `check_not_in_future`
+  $.validator.addMethod('alfuture', function(value, element, params) {
+    var state = al_date_states.get(element);
+    if (!state || !al_has_check(state, 'check_not_in_future')) {
+      return true;
+    }
+    var checked = al_check_date(state);
+    return checked.day === null || checked.day <= get_al_today_day();
+  }, function(params, element) {
+    var state = al_date_states.get(element);
+    var data = get_date_data(state);
+    return state.rules.messages[state.rules.future_birthdate]
+      .replace('{}', data.month + '/' + data.day + '/' + data.year);
+  });
+
+  // Bounds, compared as local calendar days, by the same rules and with
+  // the same default messages as the server's `check_min` and `check_max`
+  $.validator.addMethod('almin', function(value, element, params) {
+    var state = al_date_states.get(element);
+    if (!state || !state.has_min || isNaN(state.min) || !al_has_check(state, 'check_min')) {
+      return true;
+    }
+    var checked = al_check_date(state);
+    return checked.day === null || checked.day >= state.min;
+  }, function(params, element) {
+    // Each field's own message, or the default. Worked out when the message
+    // is shown, so fields don't overwrite each other's messages.
+    // https://stackoverflow.com/a/20928765/14144258
+    var state = al_date_states.get(element);
+    return state.min_message || state.rules.messages[state.rules.below_min];
+  });
+
+  $.validator.addMethod('almax', function(value, element, params) {
+    var state = al_date_states.get(element);
+    if (!state || !state.has_max || isNaN(state.max) || !al_has_check(state, 'check_max')) {
+      return true;
+    }
+    var checked = al_check_date(state);
+    return checked.day === null || checked.day <= state.max;
+  }, function(params, element) {
+    var state = al_date_states.get(element);
+    return state.max_message || state.rules.messages[state.rules.above_max];
+  });
+};  // Ends install_al_validation()
+
+function hook_al_validator(validator) {
+  /**
+  * Send the validator's errorPlacement, highlight and unhighlight through
+  * our AL date handling. Wraps each setting once per validator, so the
+  * cost per validation event stays the same however many date fields
+  * or screens there are.
+  */
+  if ( !validator || validator.al_dates_hooked ) {
+    return;
+  }
+  validator.al_dates_hooked = true;
+  
+  // Add this error validation to the existing error validation
+  var originalErrorPlacement = validator.settings.errorPlacement;
+  validator.settings.errorPlacement = function(error, element) {
+    // Finds an AL date's state
+    var state = al_date_states.get(element[0] || element);
+    
+    // If this isn't an AL date, use the original behavior, or jQuery
+    // Validate's own if there wasn't one
+    if (!state) {
+      if ( originalErrorPlacement ) {
+        originalErrorPlacement(error, element);
+      } else {
+        error.insertAfter(element);
+      }
+      return;
+    }
+    
+    // Otherwise, use our custom error labeling
+    var $parent = $(state.parent);
+    $($parent.find('span.invalid-feedback')).remove();
+    // For codepen practice:
+    // $($parent.find('label.error')).remove();
+    $(error).appendTo($parent);
+    // Add class 'is-invalid', set aria-invalid to true
+    // and aria-describedby to something like
+    // "dGVzdF8zX3BhcnQ-year-error dGVzdF8zX3BhcnQ-month-error dGVzdF8zX3BhcnQ-day-error"
+    // https://stackoverflow.com/a/53404898/14144258
+    // using the three elements' `id`s.
+    // TODO: In future, this should depend on what kind of invalidation
+    // it is. That info could be stored in a `data` attribute
+    
+  };
+  
+  // -- Styling (see al_dates.css) --
+  
+  var originalHighlight = validator.settings.highlight;
+  validator.settings.highlight = function(element, errorClass, validClass) {
+    // Finds an AL date's state
+    var state = al_date_states.get(element);
+    // Highlight all of the children inputs
+    // TODO: Only do this on min/max/invalid date failures
+    if (state) {
+      $(state.parent).addClass('invalid');
+    }
+    
+    originalHighlight.call(this, element, errorClass, validClass);
+  };
+  
+  var originalUnhighlight = validator.settings.unhighlight;
+  validator.settings.unhighlight = function(element, errorClass, validClass) {
+    // Finds an AL date's state
+    var state = al_date_states.get(element);
+    // Unhighlight all of the children inputs
+    // TODO: Only do this on min/max/invalid date failures
+    if (state) {
+      $(state.parent).removeClass('invalid');
+    }
+    
+    originalUnhighlight.call(this, element, errorClass, validClass);
+  };
+};  // Ends hook_al_validator()
+
+// -- Update on 'change' event --
+
+// One listener for the date parts of every date field. It's bound to the
+// document, so it only needs adding once, and it still works after
+// docassemble swaps in a new #daform for the next screen.
+$(document).on('change', '#daform .al-split-date', function(event) {
+  var element = this;
+  var state = al_date_states.get(element);
+  if (!state) {
+    return;
+  }
+  update_date(state);
+  hook_al_validator($('#daform').data('validator'));
+  // The whole-date message sits on the year, so refresh it too
+  if ( state.left && element !== state.year ) {
+    $(state.year).valid();
+  }
+  
+  // Show any error right away the first time each part changes. After
+  // that, jQuery Validate's own events take over.
+  if ( $(element).data('al-validation-ready') ) {
+    return;
+  }
+  $(element).data('al-validation-ready', true);
+  $(element).valid();
+});  // ends on change
+
+// Once focus leaves the whole date field, it's fair to say it's incomplete
+$(document).on('focusout', '#daform .al-split-date-parent', function(event) {
+  var state = al_date_states.get(this);
+  if ( !state || state.parent.contains(event.relatedTarget) ) {
+    return;
+  }
+  state.left = true;
+  if ( state.year.value !== '' || state.month.value !== '' || state.day.value !== '' ) {
+    hook_al_validator($('#daform').data('validator'));
+    $(state.year).valid();
+  }
+});  // ends on focusout
+
+function update_date(state) {
+  /** Update value of original input when values change. */
+  var data = get_date_data(state);
+  var val = data.month + '/' + data.day + '/' + data.year;
+  if ( val === '//' ) {
+    val = '';
+  }
+  state.input.value = val;
+};  // Ends update_date()
+
+function al_has_check(state, name) {
+  /** Whether the datatype's server-side `rules` include the one called `name` */
+  return state.rules.checks.indexOf(name) !== -1;
+}
+
+function al_check_date(state) {
+  /**
+  * Run the datatype's completeness, shape and calendar rules, only the
+  * ones in its `checks`, the way the server's `validate` does. Returns
+  * `{code, day}`: the error code or null, and the date as days from
+  * 1970-01-01, or null if the rules didn't get as far as a date.
+  */
+  var rules = state.rules;
+  var data = get_date_data(state);
+  var item = data.month + '/' + data.day + '/' + data.year;
+  if ( item === '//' ) {
+    return { code: null, day: null };
+  }
+  if ( al_has_check(state, 'check_complete') ) {
+    var mask = (data.month === '' ? 4 : 0) + (data.day === '' ? 2 : 0) + (data.year === '' ? 1 : 0);
+    if ( rules.empty_part_codes[ mask ] ) {
+      return { code: rules.empty_part_codes[ mask ], day: null };
+    }
+  }
+  var match = new RegExp(rules.pattern).exec(item);
+  if ( !match ) {
+    return { code: al_has_check(state, 'check_shape') ? rules.malformed : null, day: null };
+  }
+  if ( !al_has_check(state, 'check_calendar') ) {
+    return { code: null, day: null };
+  }
+  var month = parseInt(match[1], 10);
+  var day = parseInt(match[2], 10);
+  var year = parseInt(match[3], 10);
+  var is_leap = (year % 4 === 0) && ((year % 100 !== 0) || (year % 400 === 0));
+  if ( month < 1 || month > 12 || year < 1 ) {
+    return { code: rules.invalid_date, day: null };
+  }
+  var days_in_month = rules.month_lengths[ month ] + ((is_leap && month === 2) ? 1 : 0);
+  if ( day < 1 || day > days_in_month ) {
+    return { code: rules.invalid_date, day: null };
+  }
+  return { code: null, day: get_al_epoch_day(data) };
+};  // Ends al_check_date()
+
+function al_date_code(state) {
+  /** The error code the server would give this date, or null if it's fine or empty */
+  return al_check_date(state).code;
+};  // Ends al_date_code()
+
+function al_age_code(state) {
+  /** The server's code for an age outside the field's limits, or null */
+  var data = get_date_data(state);
+  var now = new Date();
+  var today_key = now.getFullYear() * 10000 + (now.getMonth() + 1) * 100 + now.getDate();
+  var birth_key = parseInt(data.year, 10) * 10000 + parseInt(data.month, 10) * 100 + parseInt(data.day, 10);
+  // Someone born on February 29 turns a year older on March 1 in other years
+  var age = Math.floor((today_key - birth_key) / 10000);
+  if ( age < state.min_age ) {
+    return state.rules.below_min_age;
+  }
+  if ( age > state.max_age ) {
+    return state.rules.above_max_age;
+  }
+  return null;
+};  // Ends al_age_code()
+
+// -- Exclusion calendars --
+
+// Token -> decoded calendar, so fields sharing a calendar decode it once
+var al_calendars = {};
+
+function get_al_calendar(token) {
+  /**
+  * Decode an `ExclusionCalendar.token` from al_dates.py:
+  * "first day.day count.weekday mask.base64 bits", days counted from
+  * 1970-01-01. One bit per day, set if the day is excluded.
+  */
+  if ( !token ) {
+    return null;
+  }
+  if ( al_calendars[ token ] ) {
+    return al_calendars[ token ];
+  }
+  var parts = token.split('.');
+  if ( parts.length !== 4 ) {
+    return null;
+  }
+  var raw = atob(parts[3]);
+  var bits = new Uint8Array(raw.length);
+  for (var index = 0; index < raw.length; index++) {
+    bits[index] = raw.charCodeAt(index);
+  }
+  var calendar = {
+    start: parseInt(parts[0], 10),
+    days: Math.min(parseInt(parts[1], 10), bits.length * 8),
+    weekdays: parseInt(parts[2], 10),
+    bits: bits,
+  };
+  al_calendars[ token ] = calendar;
+  return calendar;
+};  // Ends get_al_calendar()
+
+function get_al_epoch_day(data) {
+  /** Days from 1970-01-01 to the date in `data`, or null if it's not a date. */
+  var time = Date.UTC(parseInt(data.year, 10), parseInt(data.month, 10) - 1, parseInt(data.day, 10));
+  if ( isNaN(time) ) {
+    return null;
+  }
+  // Date.UTC reads years 0-99 as 1900-1999
+  var year = parseInt(data.year, 10);
+  if ( year < 100 ) {
+    var date = new Date(time);
+    date.setUTCFullYear(year);
+    time = date.getTime();
+  }
+  return Math.round(time / 86400000);
+};  // Ends get_al_epoch_day()
+
+function get_al_today_day() {
+  /** Days from 1970-01-01 to today where the user is */
+  var now = new Date();
+  return get_al_epoch_day({ year: now.getFullYear(), month: now.getMonth() + 1, day: now.getDate() });
+};  // Ends get_al_today_day()
+
+function get_al_bound_day(text) {
+  /**
+  * An `almin` or `almax` as days from 1970-01-01, or NaN if it's missing or
+  * not a date. Reads `YYYY-MM-DD` (with or without a time) and `MM/DD/YYYY`
+  * as that calendar day, the same as `compile_bound()` in al_dates.py.
+  * Anything else the browser can read is the day it falls on locally.
+  */
+  if ( !text ) {
+    return NaN;
+  }
+  var match = /^\s*(\d{4})-(\d{1,2})-(\d{1,2})/.exec(text);
+  var day = null;
+  if ( match ) {
+    day = get_al_epoch_day({ year: match[1], month: match[2], day: match[3] });
+  } else if ( (match = /^\s*(\d{1,2})\/(\d{1,2})\/(\d{4})\s*$/.exec(text)) ) {
+    day = get_al_epoch_day({ year: match[3], month: match[1], day: match[2] });
+  } else {
+    var date = new Date(text);
+    if ( !isNaN(date) ) {
+      day = get_al_epoch_day({ year: date.getFullYear(), month: date.getMonth() + 1, day: date.getDate() });
+    }
+  }
+  return day === null ? NaN : day;
+};  // Ends get_al_bound_day()
+
+function al_weekday_excluded(calendar, day) {
+  // 1970-01-01 was a Thursday, weekday 3 counting from Monday as 0
+  return Boolean((calendar.weekdays >> (((day + 3) % 7 + 7) % 7)) & 1);
+}
+
+function al_day_excluded(calendar, day) {
+  /** Whether the calendar rules out the day `day` days after 1970-01-01 */
+  var offset = day - calendar.start;
+  if ( offset >= 0 && offset < calendar.days ) {
+    return Boolean((calendar.bits[ offset >> 3 ] >> (offset & 7)) & 1);
+  }
+  return al_weekday_excluded(calendar, day);
+};  // Ends al_day_excluded()
+
+function al_next_allowed_day(calendar, day) {
+  /**
+  * The first day on or after `day` the calendar allows, or null. Like
+  * `ExclusionCalendar.next_allowed()`, but 32 days at a time, since
+  * JavaScript's bitwise operators work on 32-bit integers.
+  */
+  if ( day === null || (calendar.weekdays & 127) === 127 ) {
+    return null;
+  }
+  var end = calendar.start + calendar.days;
+  while ( day < end ) {
+    var offset = day - calendar.start;
+    if ( offset < 0 ) {
+      if ( !al_weekday_excluded(calendar, day) ) {
+        return day;
+      }
+      day += 1;
+      continue;
+    }
+    var index = offset >> 3;
+    var shift = offset & 7;
+    var span = Math.min(32 - shift, calendar.days - offset);
+    // Up to 4 bytes, lowest day first, as a 32-bit word
+    var word = 0;
+    for (var part = 0; part < 4 && index + part < calendar.bits.length; part++) {
+      word |= calendar.bits[ index + part ] << (part * 8);
+    }
+    var free = ~(word >>> shift) & (span === 32 ? -1 : (1 << span) - 1);
+    if ( free ) {
+      // The lowest set bit is the first allowed day
+      return day + 31 - Math.clz32(free & -free);
+    }
+    day += span;
+  }
+  while ( al_weekday_excluded(calendar, day) ) {
+    day += 1;
+  }
+  return day;
+};  // Ends al_next_allowed_day()
+
+function get_date_data (state) {
+  /**
+  * Given the state of a date field, return the full date data as an object.
+  * 
+  * @returns {year: str, month: str, day: str}
+  */
+  return {
+    year: state.year.value,
+    month: state.month.value,
+    day: state.day.value,
+  };
+};  // Ends get_date_data()
+
+// When `asset_tags()`'s loader adds this file after daPageLoad has been and
+// gone, docassemble has already set up the form's validator. Hook that one.
+// Never create it here with `.validate({})`: loaded through `features`, this
+// runs before docassemble's own setup, which would then get an empty
+// validator. Down here, so every top-level `var` above has its value first.
+var al_late_validator = $('#daform').data('validator');
+if ( al_late_validator ) {
+  install_al_validation();
+  hook_al_validator(al_late_validator);
+  init_al_dates(document);
+}
+
+} catch (error) {
+  console.error('Error in AL date CusotmDataTypes', error);
+}
@@ -1,6 +1,8 @@
 import os
 import sys
+import importlib.util
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 from fnmatch import fnmatchcase
 from distutils.util import convert_path
 
@@ -43,6 +45,22 @@ def find_package_data(where='.', package='', exclude=standard_exclude, exclude_d
                 out.setdefault(package, []).append(prefix+name)
     return out
 
+def package_data():
+    return find_package_data(where='docassemble/CDTCustomValidation/', package='docassemble.CDTCustomValidation')
+
+class build_py_with_assets(build_py):
+    """Build the minified, hashed al_dates files before they get copied into the package."""
+    def run(self):
+        # Loaded by path, since the docassemble namespace may not be importable yet
+        spec = importlib.util.spec_from_file_location('assets', convert_path('docassemble/CDTCustomValidation/assets.py'))
+        assets = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(assets)
+        assets.build_assets()
+        # The file list was taken before the new hashed files existed, so take it again
+        self.package_data = self.distribution.package_data = package_data()
+        self.__dict__.pop('data_files', None)
+        build_py.run(self)
+
 setup(name='docassemble.CDTCustomValidation',
       version='0.0.1',
       description=('A docassemble extension.'),
@@ -56,6 +74,12 @@ setup(name='docassemble.CDTCustomValidation',
       namespace_packages=['docassemble'],
       install_requires=[],
       zip_safe=False,
-      package_data=find_package_data(where='docassemble/CDTCustomValidation/', package='docassemble.CDTCustomValidation'),
+      cmdclass={'build_py': build_py_with_assets},
+      entry_points={
+          'console_scripts': [
+              'al-check-dates=docassemble.CDTCustomValidation.bulk_dates:main',
+          ],
+      },
+      package_data=package_data(),
      )
 
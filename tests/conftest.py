@@ -0,0 +1,30 @@
+"""
+Runs the tests against the stand-in for `docassemble.base.util` in
+benchmarks/, so they don't need a docassemble server.
+"""
+import os
+import sys
+
+import pytest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, "benchmarks"))
+
+import stub_docassemble  # noqa: E402
+
+stub_docassemble.install()
+
+from docassemble.CDTCustomValidation import al_dates  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Set `clock.now` to a timestamp to move "now" around."""
+
+    class Clock:
+        now = 0.0
+
+    monkeypatch.setattr(al_dates, "_clock", lambda: Clock.now)
+    monkeypatch.setattr(al_dates, "_today_cache", {})
+    return Clock
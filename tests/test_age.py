@@ -0,0 +1,66 @@
+import datetime
+
+import pytest
+
+from docassemble.CDTCustomValidation.al_dates import ABOVE_MAX_AGE, BELOW_MIN_AGE, age_on
+from docassemble.CDTCustomValidation.ALCustomDateTestValidation import (
+    ALBirthDateTestValidation,
+    DateValidationError,
+    check_age,
+)
+
+leap_day = datetime.date(2000, 2, 29)
+
+
+@pytest.mark.parametrize(
+    "date, age",
+    [
+        (datetime.date(2018, 2, 28), 17),
+        (datetime.date(2018, 3, 1), 18),
+        (datetime.date(2020, 2, 28), 19),
+        (datetime.date(2020, 2, 29), 20),
+    ],
+)
+def test_leap_day_birthdays(date, age):
+    assert age_on(leap_day, date) == age
+
+
+@pytest.fixture
+def march_1_2018(clock):
+    # Noon in New York, the stand-in's default timezone
+    clock.now = datetime.datetime(2018, 3, 1, 17, tzinfo=datetime.timezone.utc).timestamp()
+    return clock
+
+
+def test_check_age_codes(march_1_2018):
+    assert check_age(leap_day, alminage=18) is True
+    assert check_age("02/29/2000", almaxage=18) is True
+
+    with pytest.raises(DateValidationError) as error:
+        check_age(datetime.date(2000, 3, 2), alminage=18, field="birthdate")
+    assert error.value.code == BELOW_MIN_AGE
+    assert str(error.value) == "The age must be at least 18"
+
+    with pytest.raises(DateValidationError) as error:
+        check_age("02/28/2000", almaxage="17", almaxagemessage="Too old for juvenile court")
+    assert error.value.code == ABOVE_MAX_AGE
+    assert str(error.value) == "Too old for juvenile court"
+
+
+class AdultBirthDate(ALBirthDateTestValidation):
+    name = "AdultBirthDate"
+    input_type = "AdultBirthDate"
+    alminage = 18
+    almaxage = 120
+
+
+def test_check_age_limits_rule(march_1_2018):
+    assert AdultBirthDate.validate("02/29/2000") is True
+
+    with pytest.raises(DateValidationError) as error:
+        AdultBirthDate.validate("03/02/2000")
+    assert error.value.code == BELOW_MIN_AGE
+
+    with pytest.raises(DateValidationError) as error:
+        AdultBirthDate.validate("01/01/1890")
+    assert error.value.code == ABOVE_MAX_AGE
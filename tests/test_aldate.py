@@ -0,0 +1,68 @@
+import copy
+import datetime
+import pickle
+
+import pytest
+
+from docassemble.CDTCustomValidation.ALCustomDateTestValidation import (
+    ALCompactThreePartsDateTestValidation,
+    ALDate,
+    date_to_datetime,
+)
+
+
+def test_transform_gives_aldate():
+    answer = ALCompactThreePartsDateTestValidation.transform("02/14/1990")
+    assert type(answer) is ALDate
+    assert answer == datetime.date(1990, 2, 14)
+
+
+def test_pickle_round_trip():
+    answer = ALDate(1990, 2, 14)
+    small = pickle.dumps(answer)
+    # Building the DADateTime doesn't make the stored answer any bigger
+    answer.as_datetime()
+    assert pickle.dumps(answer) == small
+    loaded = pickle.loads(small)
+    assert type(loaded) is ALDate
+    assert loaded == answer
+    assert loaded.as_datetime() == date_to_datetime(datetime.date(1990, 2, 14))
+    assert type(copy.deepcopy(answer)) is ALDate
+
+
+def test_equality_and_hashing_are_a_dates():
+    answer = ALDate(1990, 2, 14)
+    plain = datetime.date(1990, 2, 14)
+    assert answer == plain and plain == answer
+    assert hash(answer) == hash(plain)
+    assert answer in {plain}
+    rich = answer.as_datetime()
+    assert answer != rich and rich != answer
+
+
+def test_ordering_and_subtraction_with_aldate_on_the_left():
+    answer = ALDate(1990, 2, 14)
+    later = date_to_datetime(datetime.date(2000, 1, 1))
+    assert answer < later
+    assert answer <= later
+    assert not answer > later
+    assert not answer >= later
+    assert answer < datetime.date(1990, 2, 15)
+    assert later - answer == later - answer.as_datetime()
+    assert answer - later == answer.as_datetime() - later
+    assert answer - datetime.date(1990, 2, 13) == datetime.timedelta(days=1)
+
+
+def test_datetime_on_the_left_is_not_supported():
+    answer = ALDate(1990, 2, 14)
+    later = date_to_datetime(datetime.date(2000, 1, 1))
+    with pytest.raises(TypeError):
+        later > answer
+    assert later > answer.as_datetime()
+
+
+def test_datetime_methods_go_to_the_datetime():
+    answer = ALDate(1990, 2, 14)
+    assert answer.format("MM/dd/yyyy") == "02/14/1990"
+    assert answer.hour == 0
+    assert str(answer) == str(answer.as_datetime())
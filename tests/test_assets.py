@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from docassemble.CDTCustomValidation import assets
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def copy_sources(directory):
+    for source in assets.sources:
+        shutil.copy(os.path.join(assets.static_dir, source), directory)
+
+
+def test_committed_assets_are_current():
+    assert assets.check_assets() == []
+
+
+def test_build_then_edit_round_trip(tmp_path):
+    directory = str(tmp_path)
+    copy_sources(directory)
+    assert "missing al_dates.manifest.json" in assets.check_assets(directory)
+
+    assets.build_assets(directory)
+    assert assets.check_assets(directory) == []
+    old_name = assets.hashed_name("al_dates.js", directory)
+    assert old_name != "al_dates.js"
+
+    with open(os.path.join(directory, "al_dates.js"), "a", encoding="utf-8") as source:
+        source.write("var al_dates_edited = true;\n")
+    problems = assets.check_assets(directory)
+    assert "out of date al_dates.manifest.json" in problems
+    assert f"stale {old_name}" in problems
+
+    assets.build_assets(directory)
+    assert assets.check_assets(directory) == []
+    with open(os.path.join(directory, assets.manifest_name), encoding="utf-8") as manifest_file:
+        new_name = json.load(manifest_file)["al_dates.js"]
+    assert new_name != old_name
+    assert not os.path.exists(os.path.join(directory, old_name))
+    assert os.path.exists(os.path.join(directory, new_name + ".gz"))
+
+
+def test_setup_build_includes_rebuilt_files(tmp_path):
+    tree = tmp_path / "tree"
+    shutil.copytree(
+        root,
+        tree,
+        ignore=shutil.ignore_patterns(".git", "build", "tests", "__pycache__", "*.egg-info"),
+    )
+    static = tree / "docassemble" / "CDTCustomValidation" / "data" / "static"
+    with open(static / "al_dates.js", "a", encoding="utf-8") as source:
+        source.write("var al_dates_edited = true;\n")
+    subprocess.run(
+        [sys.executable, "setup.py", "-q", "build"],
+        cwd=tree,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    built = tree / "build" / "lib" / "docassemble" / "CDTCustomValidation" / "data" / "static"
+    manifest = json.loads((built / assets.manifest_name).read_text(encoding="utf-8"))
+    for name in manifest.values():
+        assert (built / name).exists()
+
+
+def test_minify_css():
+    css = ".a  /* one */  /* two */ b {\n  color : red;\n  content: '  x  ';\n}\n"
+    assert assets.minify_css(css) == ".a b{color :red;content:'  x  '}\n"
+
+
+def test_minify_js_keeps_strings_and_regexes():
+    js = "var a = '// not a comment'; // a comment\n/* block */ var b = /[/]x/.test(a);\n"
+    assert assets.minify_js(js) == "var a = '// not a comment';\nvar b = /[/]x/.test(a);\n"
+
+
+def test_minify_js_keeps_template_literals_whole():
+    js = "var t = `a\n    b`;\n    var u = 1;  \n\n"
+    assert assets.minify_js(js) == "var t = `a\n    b`;\nvar u = 1;\n"
@@ -0,0 +1,95 @@
+import datetime
+import zoneinfo
+
+import pytest
+
+from docassemble.CDTCustomValidation.al_dates import (
+    ABOVE_MAX,
+    BELOW_MIN,
+    DateBound,
+    bounds_code,
+    compile_bound,
+)
+from docassemble.CDTCustomValidation.ALCustomDateTestValidation import (
+    DADateTime,
+    DateValidationError,
+    check_date_bounds,
+)
+
+new_years = datetime.date(2020, 1, 1).toordinal()
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["2020-01-01", "2020-01-01T12:30:00", "01/01/2020", " 01/01/2020 ", datetime.date(2020, 1, 1)],
+)
+def test_fixed_bounds(expression):
+    assert compile_bound(expression) == DateBound(new_years)
+
+
+@pytest.mark.parametrize("expression", ["${ today() }", "${today()}", "today()", "today"])
+def test_today_bounds(expression):
+    assert compile_bound(expression) == DateBound(0, from_today=True)
+
+
+@pytest.mark.parametrize("expression", [None, ""])
+def test_no_bound(expression):
+    assert compile_bound(expression) is None
+
+
+@pytest.mark.parametrize("expression", ["2020-13-01", "02/30/2020", "tomorrow", "${ now() }", 20200101])
+def test_invalid_bounds(expression):
+    with pytest.raises(ValueError):
+        compile_bound(expression)
+
+
+def test_fixed_bounds_code():
+    assert bounds_code(new_years, almin="2020-01-01") is None
+    assert bounds_code(new_years - 1, almin="2020-01-01") == BELOW_MIN
+    assert bounds_code(new_years, almax="01/01/2020") is None
+    assert bounds_code(new_years + 1, almax="01/01/2020") == ABOVE_MAX
+
+
+def test_today_bounds_code_follows_the_clock(clock):
+    # Noon in New York on January 1, 2020
+    clock.now = datetime.datetime(2020, 1, 1, 17, tzinfo=datetime.timezone.utc).timestamp()
+    assert bounds_code(new_years, almin="${ today() }", timezone="America/New_York") is None
+    assert bounds_code(new_years - 1, almin="${ today() }", timezone="America/New_York") == BELOW_MIN
+    assert bounds_code(new_years + 1, almax="${ today() }", timezone="America/New_York") == ABOVE_MAX
+    clock.now += 86400
+    assert bounds_code(new_years, almin="${ today() }", timezone="America/New_York") == BELOW_MIN
+
+
+def test_check_date_bounds_codes():
+    with pytest.raises(DateValidationError) as error:
+        check_date_bounds("12/31/2019", almin="2020-01-01", field="court_date")
+    assert error.value.code == BELOW_MIN
+    assert error.value.field == "court_date"
+    assert str(error.value) == "This date is too early"
+
+    with pytest.raises(DateValidationError) as error:
+        check_date_bounds(
+            datetime.date(2020, 1, 2), almax="2020-01-01", almaxmessage="Too late for court"
+        )
+    assert error.value.code == ABOVE_MAX
+    assert str(error.value) == "Too late for court"
+
+
+def test_check_date_bounds_passes():
+    assert check_date_bounds("01/01/2020", almin="2020-01-01", almax="2020-01-01") is True
+    # Empty or unreadable answers are validate's to report
+    assert check_date_bounds("", almin="2020-01-01") is True
+    assert check_date_bounds("not a date", almin="2020-01-01") is True
+
+
+def test_check_date_bounds_invalid_bound():
+    with pytest.raises(ValueError):
+        check_date_bounds("01/01/2020", almin="someday")
+
+
+def test_datetime_bounds_use_their_own_local_date():
+    new_york = DADateTime(2020, 1, 1, 23, tzinfo=zoneinfo.ZoneInfo("America/New_York"))
+    utc = DADateTime(2020, 1, 2, 4, tzinfo=datetime.timezone.utc)
+    assert new_york == utc
+    assert compile_bound(new_york) == DateBound(new_years)
+    assert compile_bound(utc) == DateBound(new_years + 1)
@@ -0,0 +1,69 @@
+import csv
+import datetime
+import io
+import json
+
+import pytest
+
+from docassemble.CDTCustomValidation import bulk_dates
+
+today_date = datetime.date(2020, 6, 1)
+
+
+def test_guess_format():
+    assert bulk_dates.guess_format("intake.csv") == "csv"
+    assert bulk_dates.guess_format("intake.jsonl") == "jsonl"
+    assert bulk_dates.guess_format("intake.ndjson") == "jsonl"
+    assert bulk_dates.guess_format("intake.json") == "json"
+
+
+def test_rows_that_are_not_objects():
+    lines = ['{"dob": "01/01/1990"}\n', '["01/01/1990"]\n', '"01/01/1990"\n', '{"dob": "01/01/2999"}\n']
+    rows = bulk_dates.read_jsonl_rows(lines)
+    results = list(bulk_dates.check_rows(rows, birthdate_columns=["dob"], today_date=today_date))
+    assert results == [
+        (1, {}),
+        (2, {"dob": bulk_dates.NOT_AN_OBJECT}),
+        (3, {"dob": bulk_dates.NOT_AN_OBJECT}),
+        (4, {"dob": "future_birthdate"}),
+    ]
+
+
+def test_json_array(tmp_path, capsys):
+    path = tmp_path / "intake.json"
+    path.write_text(json.dumps([{"dob": "01/01/1990"}, {"dob": "02/31/1990"}]), encoding="utf-8")
+    assert bulk_dates.main([str(path), "--birthdate", "dob", "--today", "2020-06-01"]) == 1
+    output = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert output == [
+        {"row": 1, "valid": True, "errors": {}},
+        {"row": 2, "valid": False, "errors": {"dob": "invalid_date"}},
+    ]
+
+
+def test_json_that_is_not_an_array(tmp_path):
+    path = tmp_path / "intake.json"
+    path.write_text('{"dob": "01/01/1990"}', encoding="utf-8")
+    with pytest.raises(SystemExit) as exit_info:
+        bulk_dates.main([str(path), "--birthdate", "dob"])
+    assert exit_info.value.code == 2
+
+
+def test_csv_from_stdin_keeps_line_breaks_in_fields(monkeypatch, capsys):
+    data = 'note,dob\r\n"two\r\nlines",01/01/1990\r\nthree,02/31/1990\r\n'
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(data.encode("utf-8"))))
+    seen = []
+
+    class DictReader(csv.DictReader):
+        def __next__(self):
+            row = super().__next__()
+            seen.append(row)
+            return row
+
+    monkeypatch.setattr(bulk_dates.csv, "DictReader", DictReader)
+    assert bulk_dates.main(["-", "--format", "csv", "--birthdate", "dob", "--today", "2020-06-01"]) == 1
+    assert [row["note"] for row in seen] == ["two\r\nlines", "three"]
+    output = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert output == [
+        {"row": 1, "valid": True, "errors": {}},
+        {"row": 2, "valid": False, "errors": {"dob": "invalid_date"}},
+    ]
@@ -0,0 +1,78 @@
+import datetime
+import random
+
+import pytest
+
+from docassemble.CDTCustomValidation import al_dates
+from docassemble.CDTCustomValidation.al_dates import check_dates, classify_date
+
+today_date = datetime.date(2000, 1, 1)
+
+odd_items = [
+    "",
+    None,
+    5,
+    "2/3/2020",
+    "02//2020",
+    "//",
+    "13/01/2020",
+    "00/01/2020",
+    "01/00/2020",
+    "01/01/0000",
+    "02/30/2021",
+    "02/29/2000",
+    "02/29/1900",
+    "ab/cd/efgh",
+    "02/14/1990x",
+    "02/14/19901",
+    "０１/０１/２０２０",
+    "12/31/1999",
+    "01/02/2000",
+]
+
+
+def fuzzed_items(count=20000):
+    rng = random.Random(20)
+    items = []
+    for _ in range(count):
+        if rng.random() < 0.8:
+            items.append(
+                "%02d/%02d/%04d" % (rng.randint(0, 13), rng.randint(0, 32), rng.randint(0, 2030))
+            )
+        else:
+            items.append(rng.choice(odd_items))
+    return items
+
+
+def expected(items, birthdate):
+    results = [classify_date(item, birthdate, today_date) for item in items]
+    return [code for code, _ in results], [date for _, date in results]
+
+
+@pytest.mark.parametrize("birthdate", [False, True])
+def test_numpy_list_matches_classify_date(birthdate):
+    pytest.importorskip("numpy")
+    items = odd_items + fuzzed_items()
+    result = check_dates(items, birthdate, today_date)
+    codes, dates = expected(items, birthdate)
+    assert result.codes == codes
+    assert result.dates == dates
+    assert result.valid == [code is None for code in codes]
+
+
+def test_numpy_array_matches_classify_date():
+    np = pytest.importorskip("numpy")
+    items = [item for item in odd_items + fuzzed_items() if isinstance(item, str)]
+    result = check_dates(np.array(items).reshape(-1, 1), birthdate=True, today_date=today_date)
+    codes, dates = expected(items, True)
+    assert result.codes.shape == (len(items), 1)
+    assert result.codes.ravel().tolist() == codes
+    assert [None if np.isnat(date) else date.item() for date in result.dates.ravel()] == dates
+
+
+def test_without_numpy(monkeypatch):
+    monkeypatch.setattr(al_dates, "_numpy", lambda: None)
+    codes, dates = expected(odd_items, True)
+    result = check_dates(odd_items, birthdate=True, today_date=today_date)
+    assert result.codes == codes
+    assert result.dates == dates
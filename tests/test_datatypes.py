@@ -0,0 +1,73 @@
+import pytest
+
+from docassemble.CDTCustomValidation.al_dates import BELOW_MIN, INVALID_DATE, MALFORMED
+from docassemble.CDTCustomValidation.ALCustomDateTestValidation import (
+    ALBirthDateTestValidation,
+    ALThreePartsDateTestValidation,
+    DateValidationError,
+    ordered_rules,
+    check_complete,
+    check_shape,
+    check_calendar,
+    check_min,
+    widget_script,
+    client_rules,
+)
+
+
+class HearingDate(ALThreePartsDateTestValidation):
+    name = "HearingDate"
+    input_type = "HearingDate"
+    error_messages = {
+        MALFORMED: "{} is not a hearing date",
+        INVALID_DATE: "{} is not on the calendar",
+    }
+    rules = ordered_rules(check_min, check_calendar, check_shape, check_complete)
+    javascript = widget_script(input_type, error_messages, rules).text
+    almin = "01/01/2020"
+
+
+def test_subclass_uses_its_own_messages():
+    with pytest.raises(DateValidationError) as error:
+        HearingDate.validate("4/1/abcd")
+    assert error.value.code == MALFORMED
+    assert str(error.value) == "4/1/abcd is not a hearing date"
+
+    with pytest.raises(DateValidationError) as error:
+        HearingDate.validate("02/31/2021")
+    assert error.value.code == INVALID_DATE
+
+    with pytest.raises(DateValidationError) as error:
+        HearingDate.validate("06/01/2019")
+    assert error.value.code == BELOW_MIN
+
+    assert HearingDate.validate("06/01/2021") is True
+
+
+def test_subclass_script_has_its_own_settings():
+    assert '"type": "HearingDate"' in HearingDate.javascript
+    assert "is not a hearing date" in HearingDate.javascript
+    assert (
+        '"checks": ["check_complete", "check_shape", "check_calendar", "check_min"]'
+        in HearingDate.javascript
+    )
+    assert '"check_not_in_future"' in ALBirthDateTestValidation.javascript
+    assert '"check_not_in_future"' not in ALThreePartsDateTestValidation.javascript
+
+
+def test_birthdate_messages():
+    with pytest.raises(DateValidationError) as error:
+        ALBirthDateTestValidation.validate("4/1/abcd")
+    assert "date of birth" in str(error.value)
+
+
+def test_client_rules_share_the_server_messages():
+    rules = client_rules(
+        ALBirthDateTestValidation.error_messages, ALBirthDateTestValidation.rules
+    )
+    assert rules["messages"][rules["below_min"]] == "This date is too early"
+    assert rules["messages"][rules["above_max"]] == "This date is too late"
+    with pytest.raises(DateValidationError) as error:
+        ALBirthDateTestValidation.validate("01/01/2999")
+    assert error.value.code == rules["future_birthdate"]
+    assert str(error.value) == rules["messages"][rules["future_birthdate"]].format("01/01/2999")
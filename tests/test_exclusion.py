@@ -0,0 +1,97 @@
+import datetime
+
+import pytest
+
+from docassemble.CDTCustomValidation.al_dates import ExclusionCalendar, epoch_ordinal
+
+
+def ordinal(text):
+    return datetime.date.fromisoformat(text).toordinal()
+
+
+# Fridays and weekends, and a summer recess longer than one 64-day window
+recess = [datetime.date(2024, 6, 1) + datetime.timedelta(days=n) for n in range(150)]
+holidays = recess + [datetime.date(2026, 12, day) for day in range(28, 32)]
+weekdays = (4, 5, 6)
+calendar = ExclusionCalendar(weekdays, holidays, first_year=2021, last_year=2026)
+
+
+def excluded(day):
+    return day.weekday() in weekdays or (2021 <= day.year <= 2026 and day in holidays)
+
+
+def test_bits_are_packed_one_day_per_bit_from_the_lowest():
+    calendar = ExclusionCalendar((), ["2020-01-01", "2020-01-10"], first_year=2020, last_year=2020)
+    assert calendar.days == 366
+    assert len(calendar.bits) == 46
+    assert calendar.bits[0] == 0b1
+    assert calendar.bits[1] == 0b10
+    assert not any(calendar.bits[2:])
+
+
+def test_weekdays_are_a_bit_mask():
+    assert ExclusionCalendar().weekdays == 0b1100000
+    assert calendar.weekdays == 0b1110000
+
+
+def test_is_excluded_matches_the_dates():
+    day = datetime.date(2020, 1, 1)
+    while day.year <= 2028:
+        assert calendar.is_excluded(day.toordinal()) == excluded(day), day
+        day += datetime.timedelta(days=1)
+
+
+def test_next_allowed_matches_a_day_by_day_scan():
+    start = ordinal("2020-01-01")
+    end = ordinal("2028-12-31")
+    for day in range(start, end + 1):
+        expected = day
+        while excluded(datetime.date.fromordinal(expected)):
+            expected += 1
+        assert calendar.next_allowed(day) == expected, datetime.date.fromordinal(day)
+
+
+def test_next_allowed_doesnt_stop_in_the_padding_bits():
+    # 2021-2026 is 2191 days, so the last byte has one unused bit: 2027-01-01,
+    # a Friday
+    assert calendar.days % 8 == 7
+    assert calendar.next_allowed(ordinal("2026-12-28")) == ordinal("2027-01-04")
+
+
+def test_token_round_trip():
+    token = calendar.token
+    start, days, mask, _ = token.split(".")
+    assert int(start) == ordinal("2021-01-01") - epoch_ordinal
+    assert int(days) == calendar.days
+    assert int(mask) == calendar.weekdays
+    copy = ExclusionCalendar.from_token(token)
+    assert (copy.first_ordinal, copy.days, copy.weekdays, copy.bits) == (
+        calendar.first_ordinal,
+        calendar.days,
+        calendar.weekdays,
+        calendar.bits,
+    )
+    assert copy.token == token
+
+
+def test_year_edges():
+    assert calendar.first_ordinal == ordinal("2021-01-01")
+    assert calendar.first_ordinal + calendar.days - 1 == ordinal("2026-12-31")
+    # Holidays outside the years are ignored
+    outside = ExclusionCalendar((), ["2020-12-31", "2021-01-01", "2022-01-01"], 2021, 2021)
+    assert not outside.is_excluded(ordinal("2020-12-31"))
+    assert outside.is_excluded(ordinal("2021-01-01"))
+    assert not outside.is_excluded(ordinal("2022-01-01"))
+    # One year is fine; the years default to the holidays'
+    assert ExclusionCalendar(holidays=["2022-07-04"]).days == 365
+    assert ExclusionCalendar(holidays=["2023-01-02", "2024-12-25"]).days == 365 + 366
+
+
+def test_first_year_after_last_year():
+    with pytest.raises(ValueError, match="first_year"):
+        ExclusionCalendar(first_year=2026, last_year=2025)
+
+
+def test_every_weekday_excluded():
+    with pytest.raises(ValueError):
+        ExclusionCalendar(weekdays=range(7))
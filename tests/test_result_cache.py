@@ -0,0 +1,34 @@
+import datetime
+import zoneinfo
+
+import pytest
+
+from docassemble.CDTCustomValidation.ALCustomDateTestValidation import (
+    ALDate,
+    ALThreePartsDateTestValidation,
+    DADateTime,
+    clear_result_cache,
+    configure_result_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def result_cache():
+    configure_result_cache(1024)
+    clear_result_cache()
+    yield
+    clear_result_cache()
+
+
+def test_same_instant_different_local_dates():
+    new_york = DADateTime(2020, 1, 1, 23, tzinfo=zoneinfo.ZoneInfo("America/New_York"))
+    utc = DADateTime(2020, 1, 2, 4, tzinfo=datetime.timezone.utc)
+    assert new_york == utc
+    assert ALThreePartsDateTestValidation.default_for(new_york) == "01/01/2020"
+    assert ALThreePartsDateTestValidation.default_for(utc) == "01/02/2020"
+
+
+def test_dates_and_strings_still_cached():
+    assert ALThreePartsDateTestValidation.default_for(ALDate(2020, 1, 1)) == "01/01/2020"
+    assert ALThreePartsDateTestValidation.default_for(datetime.date(2020, 1, 1)) == "01/01/2020"
+    assert ALThreePartsDateTestValidation.default_for("01/01/2020") == "01/01/2020"
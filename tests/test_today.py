@@ -0,0 +1,37 @@
+import datetime
+
+from docassemble.CDTCustomValidation import al_dates
+
+
+def utc_timestamp(*args):
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc).timestamp()
+
+
+def test_new_york_midnight(clock):
+    # 23:59:59 on January 1 in New York is 04:59:59 UTC on January 2
+    clock.now = utc_timestamp(2020, 1, 2, 4, 59, 59)
+    assert al_dates.current_date("America/New_York") == datetime.date(2020, 1, 1)
+    clock.now += 1
+    assert al_dates.current_date("America/New_York") == datetime.date(2020, 1, 2)
+    assert al_dates.today_ordinal("America/New_York") == datetime.date(2020, 1, 2).toordinal()
+
+
+def test_cache_is_per_timezone(clock):
+    clock.now = utc_timestamp(2020, 1, 2, 4, 0)
+    assert al_dates.current_date("America/New_York") == datetime.date(2020, 1, 1)
+    assert al_dates.current_date("UTC") == datetime.date(2020, 1, 2)
+    assert al_dates.current_date("America/New_York") == datetime.date(2020, 1, 1)
+
+
+def test_santiago_dst_skips_midnight(clock):
+    # On September 3, 2023, Santiago's clocks went from 23:59:59 straight
+    # to 01:00, so the new day started at 04:00 UTC with no local midnight
+    clock.now = utc_timestamp(2023, 9, 3, 3, 59, 59)
+    assert al_dates.current_date("America/Santiago") == datetime.date(2023, 9, 2)
+    clock.now += 1
+    assert al_dates.current_date("America/Santiago") == datetime.date(2023, 9, 3)
+    # And the next day starts at the usual local midnight, now UTC-3
+    clock.now = utc_timestamp(2023, 9, 4, 2, 59, 59)
+    assert al_dates.current_date("America/Santiago") == datetime.date(2023, 9, 3)
+    clock.now += 1
+    assert al_dates.current_date("America/Santiago") == datetime.date(2023, 9, 4)
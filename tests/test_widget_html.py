@@ -0,0 +1,68 @@
+import codecs
+import datetime
+import re
+
+from docassemble.CDTCustomValidation import ALCustomDateTestValidation as module
+from docassemble.CDTCustomValidation.ALCustomDateTestValidation import (
+    ALThreePartsDateTestValidation,
+    field_id,
+)
+
+
+def docassemble_id(var_name):
+    # How docassemble's `safeid()` names a field's input
+    return re.sub(r"[\n=]", "", codecs.encode(var_name.encode("utf-8"), "base64").decode())
+
+
+def test_field_id_is_docassemble_id():
+    assert field_id("court_date") == "Y291cnRfZGF0ZQ"
+    for var_name in ("x", "children[0].birthdate", "a_very_long_variable_name_" * 4):
+        assert field_id(var_name) == docassemble_id(var_name)
+
+
+def test_widget_uses_the_field_id():
+    html = ALThreePartsDateTestValidation.widget_html("court_date")
+    assert '<style>[id="Y291cnRfZGF0ZQ"]{display:none}</style>' in html
+    for part in ("month", "day", "year"):
+        assert f'id="Y291cnRfZGF0ZQ-{part}"' in html
+    assert 'id="Y291cnRfZGF0ZQ-error"' in html
+
+
+def test_selected_month():
+    html = ALThreePartsDateTestValidation.widget_html("court_date", item="3/7/2024")
+    assert '<option value="03" selected>March</option>' in html
+    assert html.count(" selected") == 1
+    assert 'value="7"' in html
+    assert 'value="2024"' in html
+
+
+def test_empty_widget():
+    html = ALThreePartsDateTestValidation.widget_html("court_date", required=True)
+    assert " selected" not in html
+    assert 'value=""' in html
+    assert html.count(" required") == 3
+
+
+def test_prefilled_from_the_variable(monkeypatch):
+    monkeypatch.setattr(module, "defined", lambda var_name: var_name == "court_date")
+    monkeypatch.setattr(module, "value", lambda var_name: datetime.date(2024, 12, 25))
+    html = ALThreePartsDateTestValidation.widget_html("court_date")
+    assert '<option value="12" selected>December</option>' in html
+    assert 'value="25"' in html
+    assert 'value="2024"' in html
+
+
+def test_prefill_goes_through_default_for():
+    html = ALThreePartsDateTestValidation.widget_html(
+        "court_date", item=datetime.datetime(2024, 1, 5, 15, 30)
+    )
+    assert '<option value="01" selected>January</option>' in html
+    assert 'value="5"' in html
+
+
+def test_values_are_escaped():
+    html = ALThreePartsDateTestValidation.widget_html("court_date", item='13/"><b>/2024')
+    assert '"><b>' not in html
+    assert 'value="&quot;&gt;&lt;b&gt;"' in html
+    # Not a month, so none is selected
+    assert " selected" not in html
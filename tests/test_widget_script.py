@@ -0,0 +1,29 @@
+from docassemble.CDTCustomValidation.ALCustomDateTestValidation import (
+    ALBirthDateTestValidation,
+    ALCompactBirthDateTestValidation,
+    ALCompactThreePartsDateTestValidation,
+    ALThreePartsDateTestValidation,
+    asset_tags,
+)
+
+
+def test_registered_script_is_not_for_page():
+    assert '"for_page": false' in ALThreePartsDateTestValidation.javascript
+
+
+def test_javascript_for_is_for_page():
+    script = ALBirthDateTestValidation.javascript_for("es")
+    assert '"for_page": true' in script
+    assert '"type": "ALBirthDateTestValidation"' in script
+
+
+def test_asset_tags_has_every_datatype_in_the_language():
+    tags = asset_tags("es")
+    assert "/packagestatic/docassemble.CDTCustomValidation/al_dates." in tags
+    for datatype in (
+        ALThreePartsDateTestValidation,
+        ALBirthDateTestValidation,
+        ALCompactThreePartsDateTestValidation,
+        ALCompactBirthDateTestValidation,
+    ):
+        assert datatype.javascript_for("es") in tags